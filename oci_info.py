@@ -3,32 +3,98 @@
 
 import oci.usage_api
 import datetime
+import enum
+import functools
+import gzip
+import hashlib
+import heapq
+import ipaddress
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
 import oci
 import argparse
+import concurrent.futures
 from rich.console import Console
 from rich.table import Table
+from rich.text import Text
+from rich.cells import cell_len
 from rich import box
 
+try:
+    import fcntl    # journal 파일 잠금 (Windows 에는 없음)
+except ImportError:
+    fcntl = None
+
 
 def main():
-    parser = argparse.ArgumentParser(description="OCI Info Extended")
+    # 하위 명령: 스냅샷 비교
+    if len(sys.argv) > 1 and sys.argv[1] == "diff":
+        return diff_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="OCI Info Extended",
+                                     epilog="스냅샷 비교: oci_info.py diff OLD NEW")
     parser.add_argument("--instance", "-i", action="store_true", help="인스턴스 정보만 표시")
     parser.add_argument("--lb", "-l", action="store_true", help="로드 밸런서 정보만 표시")
-    parser.add_argument("--nsg", "-s", action="store_true", help="NSG 인바운드 룰만 표시")
+    parser.add_argument("--lb-health", action="store_true", help="로드 밸런서 Backend 헬스 컬럼 추가 (--lb 포함)")
+    parser.add_argument("--nsg", "-s", action="store_true", help="NSG 룰만 표시 (Inbound/Outbound)")
+    parser.add_argument("--exposed", default=None, type=parse_exposed_spec, metavar="PORT/PROTO",
+                        help="노출 분석: 해당 포트/프로토콜 인바운드를 허용하는 NSG/Security List 와 인스턴스 (예: 22/tcp)")
+    parser.add_argument("--from", dest="from_cidr", default=parse_cidr_arg("0.0.0.0/0"), type=parse_cidr_arg,
+                        metavar="CIDR", help="--exposed 의 출발지 CIDR (기본 0.0.0.0/0)")
+    parser.add_argument("--attached-to", default=None, metavar="SUBNET",
+                        help="서브넷(이름 또는 OCID)에 붙어 있는 VNIC/인스턴스/볼륨/NSG/LB 표시")
+    parser.add_argument("--orphans", action="store_true", help="어디에도 붙어 있지 않은 볼륨과 사용되지 않는 NSG 표시")
     parser.add_argument("--volume", "-v", action="store_true", help="볼륨 정보만 표시 (부팅/블록)")
     parser.add_argument("--object", "-o", action="store_true", help="오브젝트 스토리지(버킷) 정보만 표시")
     parser.add_argument("--cost", action="store_true", help="비용 정보 표시 (Usage API)")  # --cost-month 예: 2025-03, 2025-02 등
     parser.add_argument("--cost-start", default=None, help="비용 조회할 연-월 (YYYY-MM). 생략 시 현재 달 1일.")
     parser.add_argument("--cost-end", default=None, help="비용 조회할 연-월-일 (YYYY-MM). 생략 시 현재 달 ~ 오늘.")
+    parser.add_argument("--cost-by-resource", action="store_true",
+                        help="리소스(OCID)별 비용을 인스턴스/LB/볼륨/버킷 테이블의 Cost 컬럼과 비용 상위 리소스 표로 표시")
+    parser.add_argument("--cost-top", type=_positive_int, default=20, metavar="N",
+                        help="--cost-by-resource 의 비용 상위 리소스 개수 (기본 20)")
+    parser.add_argument("--utilization", action="store_true",
+                        help="인스턴스 테이블에 CPU/메모리 사용률, 네트워크 전송량 컬럼 추가 (Monitoring API)")
+    parser.add_argument("--utilization-days", type=int, default=7, metavar="DAYS",
+                        help="--utilization 조회 기간 (기본 최근 7일)")
     parser.add_argument("--name", "-n", default=None, help="이름 필터 (부분 일치)")
     parser.add_argument("--compartment", "-c", default=None, help="컴파트먼트 이름 필터 (부분 일치)")
-    
+    parser.add_argument("--workers", type=int, default=8, help="병렬 API 호출 수 (기본 8)")
+    parser.add_argument("--filter", "-f", default=None,
+                        help="필터 표현식 (예: \"state=RUNNING and shape~E4 and compartment under prod\")")
+    parser.add_argument("--sort", type=parse_sort_arg, default=None, metavar="FIELD",
+                        help="정렬 필드 (예: name, state, size, compartment. 내림차순은 --sort=-size)")
+    parser.add_argument("--limit", type=_positive_int, default=None,
+                        help="섹션마다 최대 N개 리소스만 표시 (--sort 와 함께 상위 N개)")
+    parser.add_argument("--page-size", type=_positive_int, default=None,
+                        help="N행씩 나눠 출력 (TTY 에서는 페이지마다 Enter 대기, 기본: 나누지 않음)")
+    parser.add_argument("--pool-stats", action="store_true", help="종료 시 엔드포인트별 HTTP 커넥션 풀 사용 통계 표시")
+    parser.add_argument("--snapshot", default=None, metavar="FILE",
+                        help="조회한 인스턴스/LB/NSG 룰/볼륨/버킷을 압축 스냅샷 파일로 저장 (diff 로 비교)")
+    parser.add_argument("--deadline", type=float, default=None, metavar="SECONDS",
+                        help="전체 수집 시간 제한. 넘기면 남은 조회를 건너뛰고 지금까지 수집한 결과를 표시 (미완료 항목 표시)")
+    parser.add_argument("--section-deadline", type=float, default=None, metavar="SECONDS",
+                        help="섹션(리소스 그래프, NSG 룰, 버킷, 사용률, 비용 등)마다의 수집 시간 제한")
+    parser.add_argument("--journal", nargs="?", const="", default=None, metavar="FILE",
+                        help="수집 진행을 기록해 중단돼도 --resume 으로 이어받을 수 있게 함 "
+                             f"(FILE 생략 시 {JOURNAL_DIR} 아래 옵션별 파일, 정상 종료 시 삭제)")
+    parser.add_argument("--resume", action="store_true",
+                        help="--journal 로 기록한 이전 실행을 이어받아 완료된 조회는 건너뛰고 계속 수집 (--journal 포함)")
 
     args = parser.parse_args()
 
     # 어느 것도 지정 안 했다면 => 모두 True
     # (기존: 인스턴스, LB, NSG에만 적용했으나, 볼륨, 오브젝트 스토리지도 추가)
-    if not (args.instance or args.lb or args.nsg or args.volume or args.object or args.cost):
+    show_exposed = args.exposed is not None
+    show_orphans = args.orphans
+    attached_to = args.attached_to
+    if not (args.instance or args.lb or args.lb_health or args.nsg or args.volume or args.object or args.cost
+            or show_exposed or show_orphans or attached_to):
         show_instance = True
         show_lb = True
         show_nsg = True
@@ -37,813 +103,3246 @@ def main():
         show_cost = False  # 비용은 명시적으로 --cost일 때만
     else:
         show_instance = args.instance
-        show_lb = args.lb
+        show_lb = args.lb or args.lb_health
         show_nsg = args.nsg
         show_volume = args.volume
         show_object = args.object
         show_cost = args.cost
+    show_lb_health = args.lb_health
+
+    # --sort 필드는 표시할 섹션 중 하나 이상의 레코드에 있어야 함 (필드가 없는 테이블은 기본 정렬)
+    if args.sort:
+        shown_types = [record_type for shown, record_types in (
+            (show_instance, (InstanceRecord,)),
+            (show_lb, (LoadBalancerRecord,)),
+            (show_nsg, (NsgRecord,)),
+            (show_exposed, (ExposureRecord,)),
+            (attached_to, (AttachedRecord,)),
+            (show_orphans, (VolumeRecord, NsgRecord)),
+            (show_volume, (VolumeRecord,)),
+            (show_object, (BucketRecord,)),
+        ) if shown for record_type in record_types]
+        if shown_types and not any(_sort_attr(args.sort) in _record_fields(t) for t in shown_types):
+            parser.error(f"--sort {args.sort}: 표시할 섹션 어디에도 없는 필드입니다")
 
     cost_start_str = args.cost_start  # '2025-03-02' 같은 형식(미지정 시 현재 달의 1일)
     cost_end_str = args.cost_end  # '2025-03-03' 같은 형식(미지정 시 현재 일)
-    name_filter = args.name.lower() if args.name else None
-    compartment_filter = args.compartment.lower() if args.compartment else None
-
-    # -------------------------------------------------------------------------
-    # OCI 클라이언트 생성
-    # -------------------------------------------------------------------------
-    config = oci.config.from_file("~/.oci/config", "DEFAULT")
-    identity_client = oci.identity.IdentityClient(config)
-    compute_client = oci.core.ComputeClient(config)
-    virtual_network_client = oci.core.VirtualNetworkClient(config)
-    block_storage_client = oci.core.BlockstorageClient(config)
-    loadbalancer_client = oci.load_balancer.LoadBalancerClient(config)
-    object_storage_client = oci.object_storage.ObjectStorageClient(config)
-    usage_client = oci.usage_api.UsageapiClient(config)
-
-    tenancy_ocid = config["tenancy"]
 
     console = Console()
 
+    resource_filter = None
+    if args.filter:
+        try:
+            resource_filter = ResourceFilter(args.filter)
+        except FilterError as e:
+            console.print(f"[red]--filter 표현식 오류: {e}[/red]")
+            return
+
     # -------------------------------------------------------------------------
-    # 컴파트먼트 목록 가져오기
+    # OCI 클라이언트 생성 / 컴파트먼트 목록 가져오기
     # -------------------------------------------------------------------------
-    compartments = []
+    config = oci.config.from_file("~/.oci/config", "DEFAULT")
+
+    # 수집 진행 기록 (--journal / --resume): 조회 결과에 영향을 주는 옵션이 같을 때만 이어받음
+    journal = _NULL_JOURNAL
+    if args.journal is not None or args.resume:
+        journal_signature = {"tenancy": config.get("tenancy"), "name": args.name, "filter": args.filter}
+        try:
+            journal = CollectionJournal(args.journal or None, journal_signature, resume=args.resume)
+        except OSError as e:
+            console.print(f"[yellow]journal 을 쓸 수 없어 기록 없이 수집합니다: {e}[/yellow]")
+        else:
+            if args.resume and not journal.loaded:
+                console.print("[yellow]이어받을 journal 이 없거나 옵션이 달라 처음부터 수집합니다.[/yellow]")
+
+    # 시간 제한: 전체 마감은 지금부터, 섹션 마감은 섹션마다 새로 잼
+    deadline = Deadline(args.deadline, args.section_deadline)
+
+    ctx = InventoryContext(
+        config,
+        name_filter=args.name,
+        resource_filter=resource_filter,
+        workers=args.workers,
+        console=console,
+        journal=journal,
+        deadline=deadline
+    )
     try:
-        resp = identity_client.list_compartments(
-            tenancy_ocid,
-            compartment_id_in_subtree=True,
-            lifecycle_state="ACTIVE"
-        )
-        compartments.extend(resp.data)
-        # tenancy도 하나의 compartment처럼 추가
-        root_comp = identity_client.get_compartment(tenancy_ocid).data
-        compartments.append(root_comp)
+        ctx.load_compartments(args.compartment)
     except Exception as e:
         console.print(f"[red]컴파트먼트 목록 조회 실패: {e}[/red]")
         return
 
-    # 컴파트먼트 이름 필터 적용
-    if compartment_filter:
-        compartments = [
-            c for c in compartments
-            if compartment_filter in c.name.lower()
-        ]
-        if not compartments:
-            console.print(f"[yellow]컴파트먼트 '{args.compartment}'(으)로 필터링된 결과가 없습니다.[/yellow]")
+    if args.compartment and not any(args.compartment.lower() in c.name.lower() for c in ctx.all_compartments):
+        console.print(f"[yellow]컴파트먼트 '{args.compartment}'(으)로 필터링된 결과가 없습니다.[/yellow]")
+
+    # 리소스 관계 그래프: 필요한 목록 조회를 한 번에 병렬로
+    ctx.prepare(*[name for name, shown in (
+        ("instances", show_instance),
+        ("load_balancers", show_lb),
+        ("volumes", show_volume),
+        ("exposures", show_exposed),
+        ("attached", attached_to),
+        ("orphans", show_orphans),
+    ) if shown])
 
     # -------------------------------------------------------------------------
-    # [1] 인스턴스 정보
+    # 수집
     # -------------------------------------------------------------------------
-    instance_rows = []
-    state_color_map = {
-        "RUNNING": "green",
-        "STOPPED": "yellow",
-        "STOPPING": "yellow",
-        "STARTING": "cyan",
-        "PROVISIONING": "cyan",
-        "TERMINATED": "red",
-        "AVAILABLE": "green"
-    }
+    instance_records = list(collect_instances(ctx)) if show_instance else []
+    utilization = None
+    if show_instance and args.utilization:
+        utilization = {rec.id: rec for rec in collect_utilization(ctx, args.utilization_days)}
+    lb_records = list(collect_load_balancers(ctx, with_health=show_lb_health)) if show_lb else []
+    nsg_records = list(collect_nsg_rules(ctx)) if show_nsg else []
+
+    exposure_records = []
+    exposure_stats = {}
+    if show_exposed:
+        exposed_proto, exposed_port = args.exposed
+        exposure_records = list(
+            collect_exposures(ctx, exposed_proto, exposed_port, args.from_cidr, stats=exposure_stats)
+        )
+
+    attached_records = []
+    if attached_to:
+        attached_records = list(collect_attached(ctx, attached_to))
+        if not attached_records and not ctx.find_subnets(attached_to):
+            console.print(f"[yellow]서브넷 '{attached_to}' 을(를) 찾을 수 없습니다.[/yellow]")
+
+    orphan_volume_records = []
+    unused_nsg_records = []
+    if show_orphans:
+        orphan_volume_records = list(collect_orphaned_volumes(ctx))
+        unused_nsg_records = list(collect_unused_nsgs(ctx))
+
+    volume_records = list(collect_volumes(ctx)) if show_volume else []
+
+    bucket_records = []
+    if show_object:
+        # namespace 조회 실패만 여기서 알리고, 버킷 조회 중 오류는 다른 섹션과 같이 처리
+        try:
+            ctx.namespace
+        except Exception as e:
+            console.print(f"[red]Object Storage Namespace 조회 실패: {e}[/red]")
+        else:
+            bucket_records = list(collect_buckets(ctx))
+
+    if args.snapshot:
+        snapshot_sections = {
+            name: records for name, records, shown in (
+                ("instances", instance_records, show_instance),
+                ("load_balancers", lb_records, show_lb),
+                ("nsg_rules", nsg_records, show_nsg),
+                ("volumes", volume_records, show_volume),
+                ("buckets", bucket_records, show_object),
+            ) if shown
+        }
+        try:
+            saved = write_snapshot(args.snapshot, snapshot_sections)
+            console.print(f"[green]스냅샷 저장: {args.snapshot} ({saved}개 리소스)[/green]")
+            if deadline.incomplete:
+                console.print("[yellow]시간 제한으로 일부만 수집한 스냅샷입니다. diff 시 빠진 리소스가 삭제로 보일 수 있습니다.[/yellow]")
+        except OSError as e:
+            console.print(f"[red]스냅샷 저장 실패: {e}[/red]")
 
+    # --------------------------------------------------------------
+    # 6. 비용 정보
+    # --------------------------------------------------------------
+    cost_rows = {}
+    resource_costs = None
+    if show_cost or args.cost_by_resource:
+        start_date, end_date = get_date_range(cost_start_str, cost_end_str)
+    if args.cost_by_resource:
+        deadline.begin("cost")
+        resource_costs = get_resource_costs(
+            ctx.usage_client, ctx.tenancy_ocid, start_date, end_date, console=console, deadline=deadline
+        )
+    if show_cost:
+        cost_rows = get_compartment_costs(
+            usage_client=ctx.usage_client,
+            tenancy_ocid=ctx.tenancy_ocid,
+            start_time=start_date,
+            end_time=end_date,
+            console=console
+        )
+
+    # -------------------------------------------------------------------------
+    # 최종 출력
+    # -------------------------------------------------------------------------
+    # 정렬 / 개수 제한 / 페이지 단위 출력은 TableView 가 담당
+    view = TableView(page_size=args.page_size, sort=args.sort, limit=args.limit)
     if show_instance:
-        for comp in compartments:
-            comp_id = comp.id
-            comp_name = comp.name
+        render_instances(console, instance_records, view, costs=resource_costs, utilization=utilization,
+                         incomplete=deadline.missing("utilization"))
+    if show_lb:
+        render_load_balancers(console, lb_records, with_health=show_lb_health, view=view, costs=resource_costs,
+                              incomplete=deadline.missing("lb_health"))
+    if show_nsg:
+        render_nsg_rules(console, nsg_records, view)
+    if show_exposed:
+        render_exposures(console, exposure_records, exposed_proto, exposed_port, args.from_cidr, exposure_stats, view)
+    if attached_to:
+        render_attached(console, attached_records, attached_to, view)
+    if show_orphans:
+        render_orphans(console, orphan_volume_records, unused_nsg_records, view)
+    if show_volume:
+        render_volumes(console, volume_records, view, costs=resource_costs)
+    if show_object:
+        render_buckets(console, bucket_records, view, costs=resource_costs, incomplete=deadline.missing("bucket_scan"))
+    if show_cost:
+        print_cost_table(cost_rows, console, start_date, end_date)
+    if resource_costs is not None:
+        # 비용 상위 리소스: 조회 대상 컴파트먼트만, --name/--filter 가 있으면 수집한 리소스만
+        inventory = _inventory_index(instance_records, lb_records, volume_records, bucket_records)
+        selected_comps = {comp.id for comp in ctx.compartments}
+        if args.name or resource_filter:
+            include = inventory.__contains__
+        else:
+            def include(rid):
+                return rid in inventory or resource_costs.compartments.get(rid) in selected_comps
+        render_top_costs(console, resource_costs, inventory, args.cost_top, ctx.comp_name, include, view)
+    if args.pool_stats:
+        render_pool_stats(console, ctx.clients.pool_stats(), ctx.clients.pool_size)
+
+    if journal.resumed:
+        console.print(f"[dim]journal 에서 {journal.resumed}개 조회 단위를 복원했습니다.[/dim]")
+    if deadline.incomplete:
+        # 끝내지 못한 조회는 journal 에 남겨 --resume 으로 이어서 수집
+        render_incomplete(console, deadline)
+        if journal is not _NULL_JOURNAL:
+            console.print("[dim]같은 옵션에 --resume 을 붙여 실행하면 남은 조회만 이어서 수집합니다.[/dim]")
+        journal.close()
+    else:
+        journal.finish()
+
+    # 마감으로 일부만 수집했으면 종료 코드 2
+    status = EXIT_INCOMPLETE if deadline.incomplete else 0
+    if deadline.abandoned:
+        # 응답을 기다리는 작업 스레드가 남아 있으면 인터프리터 종료 시 join 으로 다시 멈추므로 바로 종료
+        console.file.flush()
+        os._exit(status)
+    return status
+
+
+# -----------------------------------------------------------------------------
+# OCI 클라이언트 팩토리 (서명자 / HTTP 커넥션 풀 공유)
+# -----------------------------------------------------------------------------
+# SDK 클라이언트는 각자 requests 세션(호스트당 커넥션 10개)과 서명자를 만든다.
+# 팩토리는 서명자 1개와 keep-alive 세션 1개를 모든 클라이언트에 붙이고, 커넥션 풀 크기를
+# --workers 에 맞춘다. compute / network / block storage 는 같은 iaas 엔드포인트라
+# 섹션이 바뀌어도 이미 맺은 TLS 연결을 그대로 재사용한다.
+
+_POOL_HOSTS = 16    # 엔드포인트(호스트) 별 풀을 유지할 개수
+
+
+def _make_signer(config):
+    """SDK 클라이언트 생성자와 같은 규칙으로 서명자 1개 생성 (개인 키는 한 번만 읽음)"""
+    if oci.util.AUTHENTICATION_TYPE_FIELD_NAME in config:
+        return oci.util.get_signer_from_authentication_type(config)
+    return oci.signer.Signer(
+        tenancy=config["tenancy"],
+        user=config["user"],
+        fingerprint=config["fingerprint"],
+        private_key_file_location=config.get("key_file"),
+        pass_phrase=oci.config.get_config_value_or_default(config, "pass_phrase"),
+        private_key_content=config.get("key_content")
+    )
 
-            try:
-                inst_list = compute_client.list_instances(compartment_id=comp_id).data
-            except Exception as e:
-                console.print(f"[red][ERROR][/red] 인스턴스 조회 실패 {comp_name}: {e}")
-                continue
 
-            for inst in inst_list:
-                if inst.lifecycle_state == "TERMINATED":
-                    continue
+class _DeadlineHTTPAdapter(oci.base_client.OCIHTTPAdapter):
+    """클라이언트들이 공유하는 커넥션 풀 어댑터: 요청마다 (connect, read) timeout 을 마감까지 남은 시간 이하로 줄임
 
-                # 이름 필터
-                if name_filter and (name_filter not in inst.display_name.lower()):
-                    continue
+    SDK 는 412/413 응답 등에서 클라이언트의 세션을 닫고 복사본으로 바꾸는데, 그때 공유 풀까지 비우지 않도록
+    close() 는 무시하고 shutdown() 에서만 닫는다.
+    """
 
-                instance_id = inst.id
-                shape = inst.shape
-                state = inst.lifecycle_state
+    def __init__(self, deadline=None, **kwargs):
+        self.deadline = deadline
+        super().__init__(**kwargs)
 
-                # vCPU / Memory
-                vcpus = "-"
-                memory_gbs = "-"
-                try:
-                    details = compute_client.get_instance(instance_id).data
-                    if details.shape_config and details.shape_config.ocpus is not None:
-                        ocpus = details.shape_config.ocpus
-                        vcpus = str(int(ocpus * 2))
-                        memory_gbs = str(details.shape_config.memory_in_gbs)
-                except:
-                    pass
+    def send(self, request, timeout=None, **kwargs):
+        remaining = self.deadline.remaining() if self.deadline is not None else None
+        if remaining is not None:
+            cap = max(remaining, 0.1)   # 0 은 requests 가 거부하므로 바로 실패하도록 짧게
+            if isinstance(timeout, tuple):
+                timeout = tuple(cap if t is None else min(t, cap) for t in timeout)
+            else:
+                timeout = cap if timeout is None else min(timeout, cap)
+        return super().send(request, timeout=timeout, **kwargs)
 
-                # VNIC (첫번째 VNIC만)
-                private_ip = "-"
-                public_ip = "-"
-                subnet_str = "-"
-                nsg_str = "-"
-                try:
-                    vnic_atts = compute_client.list_vnic_attachments(
-                        compartment_id=comp_id,
-                        instance_id=instance_id
-                    ).data
-                    if vnic_atts:
-                        vnic_id = vnic_atts[0].vnic_id
-                        vnic = virtual_network_client.get_vnic(vnic_id).data
-                        private_ip = vnic.private_ip or "-"
-                        public_ip = vnic.public_ip or "-"
-
-                        # Subnet
-                        try:
-                            subnet_info = virtual_network_client.get_subnet(vnic.subnet_id).data
-                            subnet_str = subnet_info.display_name
-                        except:
-                            pass
-
-                        # NSG
-                        if vnic.nsg_ids:
-                            nsg_names = []
-                            for nsg_id in vnic.nsg_ids:
-                                try:
-                                    nsg_obj = virtual_network_client.get_network_security_group(nsg_id).data
-                                    nsg_names.append(nsg_obj.display_name)
-                                except:
-                                    nsg_names.append("Unknown-NSG")
-                            nsg_str = ",".join(nsg_names)
-                except:
-                    pass
+    def close(self):
+        pass
 
-                # Boot Volume
-                boot_str = "-"
-                try:
-                    bvas = compute_client.list_boot_volume_attachments(
-                        availability_domain=inst.availability_domain,
-                        compartment_id=comp_id,
-                        instance_id=instance_id
-                    ).data
-                    if bvas:
-                        bv_id = bvas[0].boot_volume_id
-                        bv = block_storage_client.get_boot_volume(bv_id).data
-                        boot_str = f"{bv.size_in_gbs}GB"
-                except:
-                    pass
+    def shutdown(self):
+        super().close()
 
-                # Block Volume
-                block_str = "-"
-                try:
-                    vas = compute_client.list_volume_attachments(
-                        compartment_id=comp_id,
-                        instance_id=instance_id
-                    ).data
-                    block_list = []
-                    for va in vas:
-                        if not isinstance(va, oci.core.models.BootVolumeAttachment):
-                            vol_id = va.volume_id
-                            vol_data = block_storage_client.get_volume(vol_id).data
-                            block_list.append(f"{vol_data.size_in_gbs}GB")
-                    if block_list:
-                        block_str = ", ".join(block_list)
-                except:
-                    pass
 
-                color = state_color_map.get(state, "white")
-                state_colored = f"[{color}]{state}[/{color}]"
-
-                instance_rows.append({
-                    "compartment_name": comp_name,
-                    "instance_name": inst.display_name,
-                    "state_colored": state_colored,
-                    "subnet": subnet_str,
-                    "nsg": nsg_str,
-                    "private_ip": private_ip,
-                    "public_ip": public_ip,
-                    "shape": shape,
-                    "vcpus": vcpus,
-                    "memory": memory_gbs,
-                    "boot": boot_str,
-                    "block": block_str
-                })
-
-        instance_rows.sort(key=lambda x: (x["compartment_name"].lower(), x["instance_name"].lower()))
+class _DeadlineRetryStrategy(oci.retry.ExponentialBackOffWithDecorrelatedJitterRetryStrategy):
+    """SDK 기본 재시도(재시도 대상 오류, 지수 백오프)를 마감 안에서만
 
-    # -------------------------------------------------------------------------
-    # [2] 로드 밸런서 정보
-    # -------------------------------------------------------------------------
-    lb_rows = []
-    lb_state_map = {
-        "ACTIVE": "green",
-        "PROVISIONING": "cyan",
-        "FAILED": "red",
-        "UPDATING": "yellow",
-        "TERMINATED": "red"
-    }
+    다음 재시도까지의 대기가 마감까지 남은 시간보다 길면 더 기다리지 않고 마지막 오류를 올린다.
+    """
 
-    if show_lb:
-        for comp in compartments:
-            comp_id = comp.id
-            comp_name = comp.name
+    def __init__(self, deadline, strategy=None):
+        strategy = strategy or oci.retry.DEFAULT_RETRY_STRATEGY
+        super().__init__(strategy.base_sleep_time_seconds, strategy.exponent_growth_factor,
+                         strategy.max_wait_between_calls_seconds, strategy.checkers,
+                         decorrelated_jitter=getattr(strategy, "decorrelated_jitter", 1))
+        self.deadline = deadline
 
+    def do_sleep(self, attempt, exception):
+        wait = oci.retry.retry_sleep_utils.get_exponential_backoff_with_decorrelated_jitter_sleep_time(
+            self.base_sleep_time_seconds, self.exponent_growth_factor,
+            self.max_wait_between_calls_seconds, attempt, self.decorrelated_jitter
+        )
+        remaining = self.deadline.remaining()
+        if remaining is not None and wait >= remaining:
+            raise exception
+        time.sleep(wait)
+
+
+class ClientFactory:
+    """모든 서비스 클라이언트가 공유하는 서명자 + keep-alive 커넥션 풀
+
+    deadline 에 제한이 있으면 요청 timeout 과 SDK 재시도를 마감까지 남은 시간 안으로 제한한다.
+    """
+
+    def __init__(self, config, pool_size=8, deadline=None):
+        self.config = config
+        self.pool_size = max(pool_size, 1)
+        self.deadline = deadline if deadline is not None and deadline.limited else None
+        self.signer = _make_signer(config)
+        # 스레드 수만큼 동시에 연결을 유지해야 풀이 가득 차 연결을 버리고 새로 맺지 않음
+        self.adapter = _DeadlineHTTPAdapter(self.deadline, pool_connections=_POOL_HOSTS, pool_maxsize=self.pool_size)
+        self._clients = {}
+
+    def _session(self):
+        session = oci._vendor.requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def get(self, client_class, **kwargs):
+        """client_class 인스턴스 (클래스별 1개, 공유 서명자/커넥션 풀 사용)"""
+        client = self._clients.get(client_class)
+        if client is None:
+            if self.deadline is not None:
+                kwargs.setdefault("retry_strategy", _DeadlineRetryStrategy(self.deadline))
+            client = client_class(self.config, signer=self.signer, **kwargs)
+            base = getattr(client, "base_client", None)
+            if base is not None:
+                # 세션은 클라이언트마다 따로 (SDK 가 세션을 닫고 바꿔도 다른 클라이언트에 영향 없음), 풀만 공유
+                base.session = self._session()
+            self._clients[client_class] = client
+        return client
+
+    def pool_stats(self):
+        """호스트별 {host, requests, connections(새로 맺은 연결 수), idle} 목록"""
+        pools = self.adapter.poolmanager.pools
+        stats = []
+        for key in list(pools.keys()):
             try:
-                lb_list = loadbalancer_client.list_load_balancers(compartment_id=comp_id).data
-            except:
+                pool = pools[key]
+            except KeyError:
                 continue
+            stats.append({
+                "host": pool.host,
+                "requests": pool.num_requests,
+                "connections": pool.num_connections,
+                # 큐에는 아직 연결을 맺지 않은 빈 자리(None)도 들어 있음
+                "idle": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0,
+            })
+        return sorted(stats, key=lambda s: s["host"])
 
-            for lb in lb_list:
-                # 이름 필터
-                if name_filter and (name_filter not in lb.display_name.lower()):
-                    continue
+    def close(self):
+        self.adapter.shutdown()
 
-                lb_state = lb.lifecycle_state
-                shape_name = lb.shape_name if lb.shape_name else "-"
-                ip_list = []
-                if lb.ip_addresses:
-                    ip_list = [ip.ip_address or "-" for ip in lb.ip_addresses]
-                ip_addr_str = ", ".join(ip_list) if ip_list else "-"
-                lb_type = "PRIVATE" if (getattr(lb, 'is_private', False)) else "PUBLIC"
 
-                # backend sets
-                try:
-                    bsets = loadbalancer_client.list_backend_sets(load_balancer_id=lb.id).data
-                except:
-                    bsets = {}
-
-                if not bsets:
-                    lb_rows.append({
-                        "compartment_name": comp_name,
-                        "lb_name": lb.display_name,
-                        "lb_state": lb_state,
-                        "ip_addrs": ip_addr_str,
-                        "shape": shape_name,
-                        "lb_type": lb_type,
-                        "backend_set": "(No Backend Sets)",
-                        "backend_target": "-"
-                    })
-                else:
-                    for backend_set_name in bsets.keys():
-                        # list backends
-                        try:
-                            backend_list = loadbalancer_client.list_backends(
-                                load_balancer_id=lb.id,
-                                backend_set_name=backend_set_name
-                            ).data
-                        except:
-                            backend_list = []
-
-                        if not backend_list:
-                            lb_rows.append({
-                                "compartment_name": comp_name,
-                                "lb_name": lb.display_name,
-                                "lb_state": lb_state,
-                                "ip_addrs": ip_addr_str,
-                                "shape": shape_name,
-                                "lb_type": lb_type,
-                                "backend_set": backend_set_name,
-                                "backend_target": "(No Backends)"
-                            })
-                        else:
-                            for backend in backend_list:
-                                tgt = backend.target_id or backend.ip_address
-                                lb_rows.append({
-                                    "compartment_name": comp_name,
-                                    "lb_name": lb.display_name,
-                                    "lb_state": lb_state,
-                                    "ip_addrs": ip_addr_str,
-                                    "shape": shape_name,
-                                    "lb_type": lb_type,
-                                    "backend_set": backend_set_name,
-                                    "backend_target": tgt
-                                })
-
-        lb_rows.sort(key=lambda x: (
-            x["compartment_name"].lower(),
-            x["lb_name"].lower(),
-            x["backend_set"].lower()
-        ))
+# -----------------------------------------------------------------------------
+# 수집 진행 기록 (--resume)
+# -----------------------------------------------------------------------------
+# --journal 을 주면 작업 단위(섹션 x 컴파트먼트, NSG 룰, 버킷, 버킷 페이지)가 끝날 때마다 API 응답을
+# JSON 한 줄로 journal 파일에 append 한다. 중단 후 --resume 으로 실행하면 기록된 단위는 API 를 다시
+# 호출하지 않고 기록에서 복원하고, 스캔 중이던 버킷은 마지막 next_start_with 부터 이어서 읽는다.
+# 일부 조회가 실패한 단위는 완료로 기록하지 않는다. 정상 종료하면 journal 은 삭제한다.
 
-    # -------------------------------------------------------------------------
-    # [3] NSG 정보 (Inbound 룰)
-    # -------------------------------------------------------------------------
-    nsg_rows = []
-    if show_nsg:
-        for comp in compartments:
-            comp_name = comp.name
-            comp_id = comp.id
+JOURNAL_DIR = "~/.oci_info"
 
-            try:
-                nsg_list = virtual_network_client.list_network_security_groups(compartment_id=comp_id).data
-            except:
-                continue
 
-            for nsg in nsg_list:
-                # 이름 필터
-                if name_filter and (name_filter not in nsg.display_name.lower()):
-                    continue
+def journal_path(signature):
+    """signature 별 기본 journal 경로 (옵션이 다른 실행끼리 파일을 나눠 씀)"""
+    encoded = json.dumps(signature, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    digest = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+    return os.path.join(JOURNAL_DIR, f"journal-{digest}.jsonl")
 
-                try:
-                    rules_res = virtual_network_client.list_network_security_group_security_rules(
-                        network_security_group_id=nsg.id
-                    ).data
-                    ingress_rules = [r for r in rules_res if r.direction == "INGRESS"]
-                except:
-                    ingress_rules = []
-
-                if not ingress_rules:
-                    nsg_rows.append({
-                        "compartment_name": comp_name,
-                        "nsg_name": nsg.display_name,
-                        "desc": "(No Ingress Rules)",
-                        "proto": "-",
-                        "port_range": "-",
-                        "source": "-"
-                    })
-                else:
-                    for rule in ingress_rules:
-                        desc = rule.description if rule.description else "-"
-                        proto = rule.protocol
-                        port_range = "-"
-                        if rule.tcp_options and rule.tcp_options.destination_port_range:
-                            rng = rule.tcp_options.destination_port_range
-                            port_range = f"{rng.min}-{rng.max}"
-                        elif rule.udp_options and rule.udp_options.destination_port_range:
-                            rng = rule.udp_options.destination_port_range
-                            port_range = f"{rng.min}-{rng.max}"
-
-                        source_str = rule.source or "-"
-                        if proto == "6":
-                            proto_str = "TCP"
-                        elif proto == "17":
-                            proto_str = "UDP"
-                        elif proto == "1":
-                            proto_str = "ICMP"
-                        else:
-                            proto_str = proto
-
-                        nsg_rows.append({
-                            "compartment_name": comp_name,
-                            "nsg_name": nsg.display_name,
-                            "desc": desc,
-                            "proto": proto_str,
-                            "port_range": port_range,
-                            "source": source_str
-                        })
-
-        nsg_rows.sort(key=lambda x: (x["compartment_name"].lower(), x["nsg_name"].lower()))
 
-    # -------------------------------------------------------------------------
-    # [4] 볼륨 정보 (부팅 볼륨, 블록 볼륨)
-    # -------------------------------------------------------------------------
-    # 1) 부팅 볼륨
-    boot_rows = []
-    # 2) 블록 볼륨
-    block_rows = []
+def _list_kwargs_key(list_kwargs):
+    """목록 API 에 내려보낸 조건(list_kwargs) -> journal 단위 키에 붙일 짧은 해시 (조건이 다르면 다른 단위)"""
+    if not list_kwargs:
+        return "-"
+    encoded = json.dumps(list_kwargs, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=6).hexdigest()
 
-    if show_volume:
-        # Availability Domain 목록 (부팅 볼륨은 AD 단위로 조회)
+
+class IncompleteUnit(Exception):
+    """일부 조회가 실패한 작업 단위: data 는 실패한 부분을 비운 결과 (journal 에 완료로 기록하지 않음)"""
+
+    def __init__(self, data):
+        super().__init__("incomplete unit")
+        self.data = data
+
+
+class _Attr(dict):
+    """journal 에서 복원한 응답: SDK 모델처럼 속성으로 접근 (없는 속성은 None)"""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self.get(name)
+
+
+def _to_plain(value):
+    """SDK 모델 / 응답 -> JSON 값"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_plain(v) for k, v in value.items()}
+    if hasattr(value, "swagger_types"):
+        return _to_plain(oci.util.to_dict(value))
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if hasattr(value, "__dict__"):
+        return {k: _to_plain(v) for k, v in vars(value).items() if not k.startswith("_")}
+    return str(value)
+
+
+def _from_plain(value):
+    if isinstance(value, dict):
+        return _Attr((k, _from_plain(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_from_plain(v) for v in value]
+    return value
+
+
+class _NullJournal:
+    """journal 을 쓰지 않을 때 (기본값)"""
+
+    resumed = 0
+    loaded = False
+
+    def cached(self, key, fetch):
         try:
-            ad_list = identity_client.list_availability_domains(tenancy_ocid).data
-        except Exception as e:
-            console.print(f"[red]AD 조회 실패: {e}[/red]")
-            ad_list = []
+            return fetch()
+        except IncompleteUnit as e:
+            return e.data
 
-        # 부팅 볼륨
-        for comp in compartments:
-            comp_name = comp.name
-            comp_id = comp.id
+    def page(self, key):
+        return None
 
-            # 모든 AD에 대해 list_boot_volumes
-            for ad in ad_list:
-                ad_name = ad.name
-                try:
-                    b_vols = block_storage_client.list_boot_volumes(
-                        availability_domain=ad_name,
-                        compartment_id=comp_id
-                    ).data
-                except:
-                    b_vols = []
-
-                for bv in b_vols:
-                    # 이름 필터
-                    if name_filter and (name_filter not in bv.display_name.lower()):
-                        continue
-
-                    # 볼륨 상태, 사이즈, 붙어있는 인스턴스(있는 경우)
-                    state = bv.lifecycle_state
-                    size_gb = bv.size_in_gbs
-                    vol_name = bv.display_name
-
-                    rv_color = state_color_map.get(state, "white")
-                    state_rv_colored = f"[{rv_color}]{state}[/{rv_color}]"
-
-                    # Attachment 여부 확인
-                    # list_boot_volume_attachments 에 volume_id는 없음 -> 사용 불가
-                    # → 아래처럼 list_boot_volume_attachments로 전체를 불러와서 matching
-                    attached_instance_name = "-"
-                    try:
-                        bvas = compute_client.list_boot_volume_attachments(
-                            availability_domain=ad_name,
-                            compartment_id=comp_id
-                        ).data
-                        for bva in bvas:
-                            if bva.boot_volume_id == bv.id:
-                                # 인스턴스 이름 찾아보기
-                                try:
-                                    inst_data = compute_client.get_instance(bva.instance_id).data
-                                    attached_instance_name = inst_data.display_name
-                                except:
-                                    attached_instance_name = bva.instance_id
-                                break
-                    except:
-                        pass
-
-                    boot_rows.append({
-                        "compartment_name": comp_name,
-                        "volume_name": vol_name,
-                        "state": state_rv_colored,
-                        "size_gb": size_gb,
-                        "attached": attached_instance_name
-                    })
-
-        # 블록 볼륨
-        for comp in compartments:
-            comp_name = comp.name
-            comp_id = comp.id
+    def record_page(self, key, next_start, size, count):
+        pass
+
+    def close(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+_NULL_JOURNAL = _NullJournal()
+
+
+class CollectionJournal:
+    """작업 단위별 완료 기록 (스레드 안전, 기록마다 flush)
+
+    signature 는 수집 결과에 영향을 주는 옵션(tenancy, --name, --filter 등)이며,
+    --resume 시 기록의 signature 가 다르면 기록을 버리고 처음부터 수집한다.
+    path 가 없으면 signature 별 파일을 쓰고, 다른 실행이 같은 파일을 쓰고 있으면 OSError.
+    """
+
+    def __init__(self, path=None, signature=None, resume=False):
+        self.path = os.path.expanduser(path or journal_path(signature))
+        self.signature = signature
+        self.resumed = 0            # 기록에서 복원해 건너뛴 작업 단위 수
+        self._done = {}             # 작업 단위 key -> 응답 (복원용)
+        self._pages = {}            # 버킷 key -> (next_start, 누적 byte, 누적 개수)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 잠근 뒤에 읽고 비움: 같은 파일을 쓰는 다른 실행의 기록을 지우지 않도록
+        self._file = open(self.path, "a", encoding="utf-8")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                raise OSError(f"다른 실행이 사용 중입니다: {self.path}")
+        self.loaded = bool(resume) and self._load()
+        if not self.loaded:
+            self._file.truncate(0)
+            self._write({"signature": signature})
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+        entries = []
+        for line in lines:
             try:
-                volumes = block_storage_client.list_volumes(compartment_id=comp_id).data
-            except:
-                volumes = []
+                entries.append(json.loads(line))
+            except ValueError:
+                break   # 기록 도중 중단된 마지막 줄
+        if not entries or entries[0].get("signature") != self.signature:
+            return False
+        for entry in entries[1:]:
+            if "unit" in entry:
+                self._done[entry["unit"]] = entry["data"]
+                self._pages.pop(entry["unit"], None)
+            elif "page" in entry:
+                self._pages[entry["page"]] = (entry["next"], entry["size"], entry["count"])
+        return True
+
+    def _write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    @staticmethod
+    def _key(key):
+        return "|".join(str(k) for k in key)
+
+    def cached(self, key, fetch):
+        """key 단위가 기록에 있으면 복원, 없으면 fetch() 후 기록 (fetch 예외 / IncompleteUnit 은 기록하지 않음)"""
+        key = self._key(key)
+        if key in self._done:
+            self.resumed += 1
+            return _from_plain(self._done[key])
+        try:
+            data = fetch()
+        except IncompleteUnit as e:
+            return e.data
+        self._write({"unit": key, "data": _to_plain(data)})
+        return data
+
+    def page(self, key):
+        """스캔 중이던 목록의 (next_start, 누적 byte, 누적 개수) 또는 None"""
+        return self._pages.get(self._key(key))
+
+    def record_page(self, key, next_start, size, count):
+        self._write({"page": self._key(key), "next": next_start, "size": size, "count": count})
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def finish(self):
+        """정상 종료: 기록 삭제 (잠금을 쥔 채로 지워 그 사이 다른 실행이 열지 않도록)"""
+        if fcntl is None:
+            self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        self.close()
 
-            for vol in volumes:
-                if name_filter and (name_filter not in vol.display_name.lower()):
-                    continue
 
-                vol_name = vol.display_name
-                vol_state = vol.lifecycle_state
-                size_gb = vol.size_in_gbs
-                vol_id = vol.id
+# -----------------------------------------------------------------------------
+# 시간 제한 (--deadline, --section-deadline)
+# -----------------------------------------------------------------------------
+# 전체 / 섹션별 마감 시각을 넘기면 남은 작업(컴파트먼트, 버킷 페이지, 병렬 조회)을 건너뛰고
+# 지금까지 수집한 결과로 출력한다. 건너뛴 단위는 섹션별로 기록해 테이블 셀과 요약에 표시한다.
 
-                bv_color = state_color_map.get(vol_state, "white")
-                state_bv_colored = f"[{bv_color}]{vol_state}[/{bv_color}]"
+EXIT_INCOMPLETE = 2     # 마감으로 일부만 수집한 실행의 종료 코드
 
-                # 붙어있는 인스턴스 찾기
-                attached_inst_name = "-"
-                try:
-                    # list_volume_attachments에 volume_id 필터 사용
-                    attachments = compute_client.list_volume_attachments(
-                        compartment_id=comp_id,
-                        volume_id=vol_id
-                    ).data
-                    if attachments:
-                        # 여러개가 붙을 수 있지만 일반적으로 1개
-                        att = attachments[0]
-                        try:
-                            inst_obj = compute_client.get_instance(att.instance_id).data
-                            attached_inst_name = inst_obj.display_name
-                        except:
-                            attached_inst_name = att.instance_id
-                except:
-                    pass
 
-                block_rows.append({
-                    "compartment_name": comp_name,
-                    "volume_name": vol_name,
-                    "state": state_bv_colored,
-                    "size_gb": size_gb,
-                    "attached": attached_inst_name
-                })
+class DeadlineExceeded(Exception):
+    """작업 도중 마감: partial 은 그때까지의 중간 결과"""
 
-        # 정렬
-        boot_rows.sort(key=lambda x: (x["compartment_name"].lower(), x["volume_name"].lower()))
-        block_rows.sort(key=lambda x: (x["compartment_name"].lower(), x["volume_name"].lower()))
+    def __init__(self, partial=None):
+        super().__init__("deadline exceeded")
+        self.partial = partial
 
-    # -------------------------------------------------------------------------
-    # [5] 오브젝트 스토리지 (버킷)
-    # -------------------------------------------------------------------------
-    object_rows = []
-    if show_object:
-        # Object Storage namespace
+
+class Deadline:
+    """전체 마감(seconds) + 섹션마다 새로 시작하는 마감(section_seconds), 둘 다 None 이면 무제한"""
+
+    def __init__(self, seconds=None, section_seconds=None):
+        self.seconds = seconds
+        self.section_seconds = section_seconds
+        self._end = time.monotonic() + seconds if seconds else None
+        self._section_end = None
+        self.section = None
+        self.incomplete = {}        # 섹션 -> {라벨: None} (끝까지 조회하지 못한 컴파트먼트/버킷 등, 순서 유지)
+        self.abandoned = False      # 응답을 기다리지 않고 남겨 둔 작업 스레드가 있음
+
+    def begin(self, section):
+        """섹션 시작: 섹션 마감을 지금부터 다시 잰다"""
+        self.section = section
+        if self.section_seconds:
+            self._section_end = time.monotonic() + self.section_seconds
+
+    def remaining(self):
+        """남은 초 (무제한이면 None)"""
+        ends = [end for end in (self._end, self._section_end) if end is not None]
+        if not ends:
+            return None
+        return max(min(ends) - time.monotonic(), 0.0)
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def mark(self, label, section=None):
+        self.incomplete.setdefault(section or self.section, {})[label] = None
+
+    def missing(self, section):
+        """section 에서 끝까지 조회하지 못한 라벨 집합"""
+        return set(self.incomplete.get(section, ()))
+
+    @property
+    def limited(self):
+        return bool(self.seconds or self.section_seconds)
+
+
+def _gather(tasks, workers, deadline=None):
+    """tasks: [(라벨, 함수)] 를 병렬 실행 -> 끝난 작업의 결과 목록 (제출 순서)
+
+    마감이 지나면 시작 전 작업은 취소하고 실행 중인 작업은 기다리지 않는다 (라벨은 deadline 에 표시).
+    """
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1))
+    futures = [pool.submit(fn) for _, fn in tasks]
+    try:
+        _, pending = concurrent.futures.wait(futures, timeout=deadline.remaining() if deadline else None)
+    except KeyboardInterrupt:
+        # 아직 시작하지 않은 작업은 취소 (끝난 단위는 이미 journal 에 있음)
+        for fut in futures:
+            fut.cancel()
+        pool.shutdown(wait=False)
+        raise
+
+    for (label, _), fut in zip(tasks, futures):
+        if fut in pending:
+            if not fut.cancel():
+                deadline.abandoned = True
+            deadline.mark(label)
+    pool.shutdown(wait=not pending)
+    results = []
+    for (label, _), fut in zip(tasks, futures):
+        if fut in pending:
+            continue
         try:
-            namespace = object_storage_client.get_namespace().data
-        except Exception as e:
-            console.print(f"[red]Object Storage Namespace 조회 실패: {e}[/red]")
-            namespace = None
+            results.append(fut.result())
+        except DeadlineExceeded as e:
+            # 페이지 사이에서 마감: 지금까지의 결과만 쓰고 라벨은 미완료로 표시
+            deadline.mark(label)
+            if e.partial is not None:
+                results.append(e.partial)
+    return results
+
+
+def _iter_pages(list_fn, deadline=None, **kwargs):
+    """list_fn 의 페이지 응답을 차례로 (next_page 로 이어 읽음)
+
+    SDK 의 pagination 헬퍼는 페이지마다 DEFAULT_RETRY_STRATEGY 로 다시 감싸 클라이언트의 (마감) 재시도 전략을
+    우회하므로 직접 페이지를 넘긴다. 페이지를 읽기 전에 deadline 이 지나 있으면 DeadlineExceeded.
+    """
+    page = None
+    while True:
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded()
+        if page:
+            kwargs["page"] = page
+        response = list_fn(**kwargs)
+        yield response
+        page = response.next_page
+        if not page:
+            return
+
+
+def _list_pages(list_fn, deadline=None, **kwargs):
+    """list_fn 의 모든 페이지 항목 목록 (마감이면 지금까지의 항목을 담아 DeadlineExceeded)"""
+    items = []
+    try:
+        for response in _iter_pages(list_fn, deadline, **kwargs):
+            data = response.data
+            items.extend(data if isinstance(data, list) else data.items)
+    except DeadlineExceeded:
+        raise DeadlineExceeded(items)
+    return items
 
-        if namespace:
-            for comp in compartments:
-                comp_name = comp.name
-                comp_id = comp.id
-                try:
-                    buckets = object_storage_client.list_buckets(
-                        namespace_name=namespace,
-                        compartment_id=comp_id
-                    ).data
-                except:
-                    buckets = []
-
-                for bkt in buckets:
-                    # --name 필터
-                    if name_filter and (name_filter not in bkt.name.lower()):
-                        continue
-
-                    # 버킷 get: public_access_type, storage_tier
-                    # 하지만 approximate_size/approximate_count는 null일 수 있음
-                    access_str = "NoPublicAccess"
-                    tier_str = "-"
-                    try:
-                        bkt_detail = object_storage_client.get_bucket(
-                            namespace_name=namespace,
-                            bucket_name=bkt.name
-                        ).data
-                        if bkt_detail.public_access_type:
-                            access_str = bkt_detail.public_access_type
-                        if bkt_detail.storage_tier:
-                            tier_str = bkt_detail.storage_tier
-                    except:
-                        pass
-
-                    # public_access_type에 색상 추가 (노랑 / 초록)
-                    access_color_map = {
-                        "NoPublicAccess": "yellow",  # 노랑
-                        # 그외(예: ObjectRead, ObjectReadWrite 등) → 초록
-                    }
-                    color = access_color_map.get(access_str, "green")
-                    colored_access_str = f"[{color}]{access_str}[/{color}]"
-
-                    # 버킷 내 실제 오브젝트 합산
-                    total_size_bytes = 0
-                    total_count = 0
-
-                    # list_objects() → while loop로 페이지네이션
-                    next_start = None
-                    while True:
-                        try:
-                            list_resp = object_storage_client.list_objects(
-                                namespace_name=namespace,
-                                bucket_name=bkt.name,
-                                start=next_start,
-                                limit=1000,  # 한 페이지 최대 건수
-                                fields="size,etag"
-                            )
-                        except:
-                            break
-
-                        objs = list_resp.data.objects or []
-                        total_count += len(objs)
-
-                        for obj in objs:
-                            total_size_bytes += obj.size or 0
-
-                        # 다음 페이지가 있는지 확인
-                        if list_resp.data.next_start_with:
-                            next_start = list_resp.data.next_start_with
-                        else:
-                            break
-
-                    # Byte -> GB 변환
-                    size_in_gb = total_size_bytes / (1024 ** 3) if total_size_bytes else 0.0
-                    size_str = f"{size_in_gb:.2f}GB"
-                    count_str = str(total_count)
-
-                    object_rows.append({
-                        "compartment_name": comp_name,
-                        "bucket_name": bkt.name,
-                        "access_colored": colored_access_str,  # 색상 입힌 접근 권한
-                        "tier": tier_str,                     # STANDARD / ARCHIVE 등
-                        "approx_size": size_str,              # 직접 계산
-                        "approx_count": count_str
-                    })
-
-            # 정렬
-            object_rows.sort(key=lambda x: (x["compartment_name"].lower(), x["bucket_name"].lower()))
 
-    # --------------------------------------------------------------
-    # 6. 비용 정보
-    # --------------------------------------------------------------
-    cost_rows = {}
-    if show_cost:
-        start_date, end_date = get_date_range(cost_start_str, cost_end_str)
-        cost_rows = get_compartment_costs(
-            usage_client=usage_client,
-            tenancy_ocid=tenancy_ocid,
-            start_time=start_date,
-            end_time=end_date,
-            console=console
+# -----------------------------------------------------------------------------
+# 수집(collector) API
+# -----------------------------------------------------------------------------
+# 리소스 종류별 collect_* 제너레이터가 InventoryContext 를 받아 타입이 있는 레코드를
+# 돌려준다. 크기는 정수(GB/byte), 상태는 LifecycleState 로 두고 색상/문자열 변환은
+# render_* 에서만 한다. 다른 스크립트에서 그대로 import 해서 쓸 수 있다.
+#
+#   ctx = InventoryContext.from_config(resource_filter="state=RUNNING")
+#   for inst in collect_instances(ctx):
+#       print(inst.name, inst.state.value, inst.boot_volume_gb)
+
+class LifecycleState(str, enum.Enum):
+    """OCI lifecycle_state 값 (모르는 값은 UNKNOWN_ENUM_VALUE, SDK 와 동일)"""
+
+    RUNNING = "RUNNING"
+    STOPPED = "STOPPED"
+    STOPPING = "STOPPING"
+    STARTING = "STARTING"
+    PROVISIONING = "PROVISIONING"
+    CREATING_IMAGE = "CREATING_IMAGE"
+    MOVING = "MOVING"
+    TERMINATING = "TERMINATING"
+    TERMINATED = "TERMINATED"
+    AVAILABLE = "AVAILABLE"
+    RESTORING = "RESTORING"
+    FAULTY = "FAULTY"
+    CREATING = "CREATING"
+    ACTIVE = "ACTIVE"
+    UPDATING = "UPDATING"
+    INACTIVE = "INACTIVE"
+    FAILED = "FAILED"
+    DELETING = "DELETING"
+    DELETED = "DELETED"
+    UNKNOWN_ENUM_VALUE = "UNKNOWN_ENUM_VALUE"
+
+    @classmethod
+    def _missing_(cls, value):
+        return cls.UNKNOWN_ENUM_VALUE
+
+
+class BackendHealth(str, enum.Enum):
+    OK = "OK"
+    WARNING = "WARNING"
+    CRITICAL = "CRITICAL"
+    UNKNOWN = "UNKNOWN"
+
+    @classmethod
+    def _missing_(cls, value):
+        return cls.UNKNOWN
+
+
+def _state(value):
+    return LifecycleState(value) if value else None
+
+
+class _Record:
+    """__slots__ 레코드 공통: 키워드 생성자, as_dict(), repr"""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"{type(self).__name__}: 알 수 없는 필드 {sorted(unknown)}")
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __hash__(self):
+        # 같은 레코드는 id 도 같으므로 __eq__ 와 일관 (id 가 없는 레코드는 타입별로 같은 해시)
+        return hash((type(self).__name__, getattr(self, "id", None)))
+
+
+class InstanceRecord(_Record):
+    __slots__ = ("compartment_name", "id", "name", "state", "shape", "availability_domain",
+                 "vcpus", "memory_gb", "subnet", "nsgs", "private_ip", "public_ip",
+                 "boot_volume_gb", "block_volume_gb")
+
+
+class BackendRecord(_Record):
+    # target: 인스턴스 이름으로 풀린 backend 대상, health: --lb-health 가 아니면 None
+    __slots__ = ("backend_set", "name", "ip_address", "target", "health")
+
+
+class LoadBalancerRecord(_Record):
+    # backend_sets: backend set 이름 전체 (backend 가 없는 set 포함)
+    __slots__ = ("compartment_name", "id", "name", "state", "shape", "ip_addresses", "is_private",
+                 "backend_sets", "backends")
+
+
+class NsgRecord(_Record):
+    # rules: SecurityRuleRecord 튜플 (Inbound 먼저), 조회하지 않았으면 None
+    __slots__ = ("compartment_name", "id", "name", "state", "rules")
+
+
+class VolumeRecord(_Record):
+    # kind: KIND_BOOT_VOLUME / KIND_VOLUME, attached_to: 인스턴스 이름 또는 None
+    __slots__ = ("compartment_name", "id", "name", "kind", "state", "size_gb", "availability_domain",
+                 "attached_to")
+
+
+class BucketRecord(_Record):
+    __slots__ = ("compartment_name", "id", "name", "public_access_type", "storage_tier", "size_bytes", "object_count")
+
+    @property
+    def size_gb(self):
+        return self.size_bytes / (1024 ** 3) if self.size_bytes else 0.0
+
+
+class ExposureRecord(_Record):
+    # rules: 매칭된 SecurityRuleRecord 튜플, instances: 영향받는 인스턴스 이름 튜플
+    __slots__ = ("compartment_name", "owner_type", "owner_id", "owner_name", "rules", "instances")
+
+
+class AttachedRecord(_Record):
+    __slots__ = ("subnet", "kind", "id", "name", "compartment_name")
+
+
+class UtilizationRecord(_Record):
+    # *_avg / *_max: 기간 중 일 평균의 평균 / 일 최대의 최대 (%), network_*_gb: 기간 합계, 값이 없으면 None
+    __slots__ = ("id", "cpu_avg", "cpu_max", "memory_avg", "memory_max", "network_in_gb", "network_out_gb")
+
+
+# 수집 함수별 그래프 요구사항: (결과로 내보내는 목록의 part, {필요한 part: 전체 컴파트먼트 조회 여부})
+# LB backend / 노출 분석 / 관계 질의 / 미사용 판정은 다른 컴파트먼트의 리소스를 가리킬 수 있다.
+# --filter pushdown 은 그 목록을 결과로만 쓰는 경우에만 적용 (관계를 잇는 데 쓰이는 목록은 줄이지 않음)
+_GRAPH_REQUIREMENTS = {
+    "instances": ("compute", {"compute": False, "attachments": False, "network": True, "storage": False}),
+    "load_balancers": ("lb", {"compute": True, "vnic_ips": True, "lb": False}),
+    "volumes": ("storage", {"compute": False, "attachments": False, "storage": False}),
+    "exposures": (None, {"compute": True, "network": True}),
+    "attached": (None, {"compute": True, "attachments": True, "network": True, "storage": True, "lb": True}),
+    "orphans": ("storage", {"attachments": True, "network": True, "storage": False, "lb": True}),
+}
+
+
+class InventoryContext:
+    """수집 함수들이 공유하는 OCI 클라이언트, 컴파트먼트 목록, 필터, 리소스 그래프"""
+
+    def __init__(self, config, name_filter=None, resource_filter=None, workers=8, console=None, clients=None,
+                 journal=None, deadline=None):
+        self.deadline = deadline or Deadline()
+        # 서명자 / 커넥션 풀은 팩토리가 관리 (컨텍스트를 다시 만들어도 clients 를 넘기면 연결 재사용)
+        self.clients = clients or ClientFactory(config, pool_size=workers, deadline=self.deadline)
+        self.identity_client = self.clients.get(oci.identity.IdentityClient)
+        self.compute_client = self.clients.get(oci.core.ComputeClient)
+        self.virtual_network_client = self.clients.get(oci.core.VirtualNetworkClient)
+        self.block_storage_client = self.clients.get(oci.core.BlockstorageClient)
+        self.loadbalancer_client = self.clients.get(oci.load_balancer.LoadBalancerClient)
+        self.object_storage_client = self.clients.get(oci.object_storage.ObjectStorageClient)
+        self.usage_client = self.clients.get(oci.usage_api.UsageapiClient)
+        self.monitoring_client = self.clients.get(oci.monitoring.MonitoringClient)
+        self.tenancy_ocid = config["tenancy"]
+
+        self.name_filter = name_filter.lower() if name_filter else None
+        if isinstance(resource_filter, str):
+            resource_filter = ResourceFilter(resource_filter)
+        self.resource_filter = resource_filter
+        self.workers = workers
+        self.console = console
+        self.journal = journal or _NULL_JOURNAL
+
+        self.all_compartments = None
+        self.compartments = None
+        self._selected_comp_ids = set()
+        self.comp_fields_map = {}
+        self.comp_name_map = {}
+        self.graph = None
+        self._graph_collectors = frozenset()
+        self._ad_names = None
+        self._namespace = None
+        self._metric_cache = {}     # (필드, 컴파트먼트, 기간) -> {OCID: [값]} (collect_utilization)
+
+    @classmethod
+    def from_config(cls, file_location="~/.oci/config", profile_name="DEFAULT", **kwargs):
+        return cls(oci.config.from_file(file_location, profile_name), **kwargs)
+
+    def _warn(self, message):
+        if self.console is not None:
+            self.console.print(message)
+
+    # ---- 컴파트먼트 ---------------------------------------------------------
+    def load_compartments(self, compartment_filter=None):
+        """하위 컴파트먼트 + tenancy(root) 조회 후 이름 필터 / --filter 로 조회 대상 결정 (실패 시 예외)"""
+        compartments = list(self.identity_client.list_compartments(
+            self.tenancy_ocid,
+            compartment_id_in_subtree=True,
+            lifecycle_state="ACTIVE"
+        ).data)
+        # tenancy도 하나의 compartment처럼 추가
+        compartments.append(self.identity_client.get_compartment(self.tenancy_ocid).data)
+
+        # LB backend가 다른 컴파트먼트의 인스턴스를 가리킬 수 있으므로 필터 전 전체 목록 보관
+        self.all_compartments = list(compartments)
+        self.comp_name_map = {c.id: c.name for c in compartments}
+        # 컴파트먼트 경로(서브트리) 정보는 이름 필터로 목록을 줄이기 전에 계산
+        self.comp_fields_map = _compartment_fields(compartments)
+
+        if compartment_filter:
+            compartment_filter = compartment_filter.lower()
+            compartments = [c for c in compartments if compartment_filter in c.name.lower()]
+
+        # --filter 로 컴파트먼트 단계에서 이미 False가 확정되는 컴파트먼트는 아예 조회하지 않음
+        if self.resource_filter:
+            compartments = [
+                c for c in compartments
+                if self.resource_filter.evaluate(self.comp_fields_map[c.id]) is not False
+            ]
+        self.compartments = compartments
+        self._selected_comp_ids = {c.id for c in compartments}
+        self.graph = None
+        self._graph_collectors = frozenset()
+        return compartments
+
+    def comp_name(self, comp_id):
+        return self.comp_name_map.get(comp_id, "-")
+
+    @property
+    def ad_names(self):
+        if self._ad_names is None:
+            try:
+                self._ad_names = [
+                    ad.name for ad in self.identity_client.list_availability_domains(self.tenancy_ocid).data
+                ]
+            except Exception as e:
+                self._warn(f"[red]AD 조회 실패: {e}[/red]")
+                self._ad_names = []
+        return self._ad_names
+
+    @property
+    def namespace(self):
+        """Object Storage namespace (실패 시 예외)"""
+        if self._namespace is None:
+            self._namespace = self.object_storage_client.get_namespace().data
+        return self._namespace
+
+    # ---- 리소스 그래프 ------------------------------------------------------
+    def prepare(self, *collectors):
+        """collectors(_GRAPH_REQUIREMENTS 키)에 필요한 그래프를 한 번에 구성
+
+        이미 구성된 그래프로 충분하면 그대로 쓰고, 부족하면 합집합으로 다시 만든다.
+        """
+        if self.compartments is None:
+            self.load_compartments()
+
+        collectors = self._graph_collectors.union(collectors)
+        if self.graph is not None and collectors == self._graph_collectors:
+            return self.graph
+
+        wide = {}       # part -> 한 수집 함수라도 전체 컴파트먼트를 요구하는지
+        own = {}        # part -> 그 part 를 쓰는 수집 함수들이 결과로 내보내는 목록의 part
+        for name in collectors:
+            own_part, need = _GRAPH_REQUIREMENTS[name]
+            for part, need_wide in need.items():
+                wide[part] = wide.get(part, False) or need_wide
+                own.setdefault(part, set()).add(own_part)
+
+        ad_names = self.ad_names if set(wide) & {"attachments", "network", "storage"} else []
+        # 네트워크 리소스는 보통 별도 컴파트먼트에 있으므로 항상 전체 조회
+        scopes = {
+            part: self.all_compartments if need_wide else self.compartments
+            for part, need_wide in wide.items() if part != "vnic_ips"
+        }
+        # network 전체를 읽지 않을 때는 VNIC 이 속한 서브넷의 private IP 만 조회 (LB backend 해석용)
+        vnic_ips = "vnic_ips" in wide and "network" not in wide
+
+        # state/name/ad 조건은 목록 API 파라미터로 내려보냄 (그 목록을 결과로만 쓰는 part 에 한해)
+        list_kwargs = {}
+        rf = self.resource_filter
+        if rf:
+            for part, kind, params in (("compute", KIND_INSTANCE, _INSTANCE_PUSHDOWN),
+                                       ("storage", KIND_VOLUME, _VOLUME_PUSHDOWN),
+                                       ("lb", KIND_LOAD_BALANCER, _LB_PUSHDOWN)):
+                if own.get(part) == {part} and not wide[part]:
+                    list_kwargs[kind] = rf.api_params(params)
+
+        self.deadline.begin("graph")
+        self.graph = build_resource_graph(
+            self.compute_client, self.virtual_network_client, self.block_storage_client, self.loadbalancer_client,
+            scopes, ad_names, self.workers,
+            list_kwargs=list_kwargs,
+            keep_tags=bool(rf and rf.references("tag")),
+            journal=self.journal,
+            deadline=self.deadline,
+            vnic_ips=vnic_ips
         )
+        self._graph_collectors = collectors
+        return self.graph
+
+    def selected(self, node):
+        """선택된 컴파트먼트 + --name + --filter 조건"""
+        if node.compartment_id not in self._selected_comp_ids:
+            return False
+        if self.name_filter and self.name_filter not in (node.name or "").lower():
+            return False
+        if self.resource_filter:
+            return self.resource_filter.evaluate(_node_fields(self.graph, node, self.comp_fields_map), final=True)
+        return True
+
+    def find_subnets(self, subnet):
+        """이름 또는 OCID 로 서브넷 노드 OCID 목록"""
+        return [n.id for n in self.prepare().of_kind(KIND_SUBNET) if subnet in (n.id, n.name)]
+
+
+def collect_instances(ctx):
+    """InstanceRecord (Primary VNIC 기준 IP / 서브넷 / NSG, 부팅 / 블록 볼륨 크기)"""
+    graph = ctx.prepare("instances")
+    # TERMINATED 인스턴스는 --filter 로 state를 직접 지정한 경우에만 표시
+    skip_terminated = not (ctx.resource_filter and ctx.resource_filter.references("state"))
+
+    for inst in graph.of_kind(KIND_INSTANCE):
+        if skip_terminated and inst.state == "TERMINATED":
+            continue
+        if not ctx.selected(inst):
+            continue
 
+        # VNIC (Primary VNIC만)
+        private_ip = public_ip = subnet = None
+        nsgs = ()
+        vnic = graph.primary_vnic(inst.id)
+        if vnic is not None:
+            private_ip = vnic.private_ip
+            public_ip = vnic.public_ip
+            subnet_ids = graph.out(vnic.id, EDGE_SUBNET)
+            if subnet_ids:
+                subnet = graph.name_of(subnet_ids[0])
+            nsgs = tuple(graph.name_of(n) for n in graph.out(vnic.id, EDGE_NSG))
+
+        # Boot / Block Volume (다른 컴파트먼트의 볼륨은 그래프에 없으면 OCID 로 조회)
+        boot_gb = None
+        for bv_id in graph.out(inst.id, EDGE_BOOT_VOLUME):
+            boot_gb = graph.volume_size(bv_id)
+            if boot_gb is not None:
+                break
+        block_gb = tuple(
+            size for size in (graph.volume_size(v) for v in graph.out(inst.id, EDGE_VOLUME)) if size is not None
+        )
 
+        yield InstanceRecord(
+            compartment_name=ctx.comp_name(inst.compartment_id),
+            id=inst.id,
+            name=inst.name,
+            state=_state(inst.state),
+            shape=inst.shape,
+            availability_domain=inst.ad,
+            vcpus=inst.vcpus,
+            memory_gb=inst.memory_gb,
+            subnet=subnet,
+            nsgs=nsgs,
+            private_ip=private_ip,
+            public_ip=public_ip,
+            boot_volume_gb=boot_gb,
+            block_volume_gb=block_gb
+        )
 
-    # -------------------------------------------------------------------------
-    # 최종 출력
-    # -------------------------------------------------------------------------
 
-    # 1) 인스턴스
-    if show_instance:
-        inst_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
-        inst_table.add_column("Compartment", style="bold magenta")
-        inst_table.add_column("Instance Name", style="bold cyan")
-        inst_table.add_column("State", justify="center")
-        inst_table.add_column("Subnet")
-        inst_table.add_column("NSG")
-        inst_table.add_column("Private IP")
-        inst_table.add_column("Public IP")
-        inst_table.add_column("Shape")
-        inst_table.add_column("vCPUs", justify="right")
-        inst_table.add_column("Memory(GB)", justify="right")
-        inst_table.add_column("Boot Volume", justify="left")
-        inst_table.add_column("Block Volumes", justify="left")
-
-        console.print("[bold underline]Instance Info[/bold underline]")
-        if instance_rows:
-            current_comp = None
-            for row in instance_rows:
-                if row["compartment_name"] != current_comp:
-                    if current_comp is not None:
-                        inst_table.add_section()
-                    current_comp = row["compartment_name"]
-
-                inst_table.add_row(
-                    row["compartment_name"],
-                    row["instance_name"],
-                    row["state_colored"],
-                    row["subnet"],
-                    row["nsg"],
-                    row["private_ip"],
-                    row["public_ip"],
-                    row["shape"],
-                    row["vcpus"],
-                    row["memory"],
-                    row["boot"],
-                    row["block"]
+def collect_load_balancers(ctx, with_health=False):
+    """LoadBalancerRecord (backend 대상은 인스턴스 이름으로, with_health 면 backend 헬스 포함)"""
+    graph = ctx.prepare("load_balancers")
+    matched_lbs = [lb for lb in graph.of_kind(KIND_LOAD_BALANCER) if ctx.selected(lb)]
+
+    # Backend 헬스: LB마다 독립적인 호출이므로 병렬로 조회 (마감 시 못 끝낸 LB 는 "컴파트먼트/LB" 로 표시)
+    lb_health_map = {}
+    if with_health and matched_lbs:
+        ctx.deadline.begin("lb_health")
+        tasks = [
+            (f"{ctx.comp_name(lb.compartment_id)}/{lb.name}",
+             functools.partial(lambda lb: (lb.id, get_lb_backend_health(ctx.loadbalancer_client, lb)), lb))
+            for lb in matched_lbs
+        ]
+        lb_health_map = dict(_gather(tasks, ctx.workers, ctx.deadline))
+
+    # backend set / backend 정보는 list_load_balancers 응답에 이미 포함되어 있고,
+    # Backend Target 은 그래프의 IP/OCID 색인으로 인스턴스 이름으로 표시
+    for lb in matched_lbs:
+        health = lb_health_map.get(lb.id, {})
+        vcn_ids = graph.vcns_of(lb.id)
+        backends = []
+        for backend_set_name, set_backends in lb.backend_sets:
+            for backend_name, ip_address, target in set_backends:
+                status = health.get((backend_set_name, backend_name))
+                backends.append(BackendRecord(
+                    backend_set=backend_set_name,
+                    name=backend_name,
+                    ip_address=ip_address,
+                    target=graph.resolve_target(target, vcn_ids),
+                    health=BackendHealth(status) if status else None
+                ))
+
+        yield LoadBalancerRecord(
+            compartment_name=ctx.comp_name(lb.compartment_id),
+            id=lb.id,
+            name=lb.name,
+            state=_state(lb.state),
+            shape=lb.shape,
+            ip_addresses=lb.ip_addresses,
+            is_private=lb.is_private,
+            backend_sets=tuple(name for name, _ in lb.backend_sets),
+            backends=tuple(backends)
+        )
+
+
+def collect_nsg_rules(ctx):
+    """NsgRecord (Inbound / Outbound 룰 포함)"""
+    if ctx.compartments is None:
+        ctx.load_compartments()
+    rf = ctx.resource_filter
+    nsg_list_kwargs = rf.api_params(_NSG_PUSHDOWN) if rf else {}
+    nsg_key = _list_kwargs_key(nsg_list_kwargs)
+    ctx.deadline.begin("nsg_rules")
+
+    for comp in ctx.compartments:
+        if ctx.deadline.expired():
+            ctx.deadline.mark(comp.name)
+            continue
+        try:
+            nsg_list = ctx.journal.cached(("nsgs", comp.id, nsg_key), lambda: ctx.virtual_network_client.list_network_security_groups(
+                compartment_id=comp.id, **nsg_list_kwargs
+            ).data)
+        except Exception:
+            continue
+
+        for nsg in nsg_list:
+            # 이름 필터
+            if ctx.name_filter and (ctx.name_filter not in nsg.display_name.lower()):
+                continue
+
+            # --filter: NSG 단위 조건은 룰 조회 전에, ip(=룰 source/destination) 조건은 룰마다 평가
+            nsg_fields = None
+            if rf:
+                nsg_fields = dict(
+                    ctx.comp_fields_map[comp.id],
+                    name=nsg.display_name,
+                    state=nsg.lifecycle_state,
+                    tags=_tag_fields(nsg),
                 )
-            console.print(inst_table)
+                if rf.evaluate(nsg_fields) is False:
+                    continue
+
+            # 마감: 이 컴파트먼트의 남은 NSG 는 건너뜀
+            if ctx.deadline.expired():
+                ctx.deadline.mark(comp.name)
+                break
+            try:
+                rules = ctx.journal.cached(("nsg_rules", nsg.id), lambda: _list_pages(
+                    ctx.virtual_network_client.list_network_security_group_security_rules, ctx.deadline,
+                    network_security_group_id=nsg.id
+                ))
+            except DeadlineExceeded as e:
+                rules = e.partial
+                ctx.deadline.mark(comp.name)
+            except Exception:
+                rules = []
+
+            # Inbound 먼저, 그다음 Outbound
+            rules.sort(key=lambda r: r.direction != "INGRESS")
+            records = [
+                SecurityRuleRecord("NSG", nsg.id, nsg.display_name, comp.name, r.direction, r)
+                for r in rules
+            ]
+
+            if rf:
+                records = [r for r in records if rf.evaluate(dict(nsg_fields, ip=r.peer), final=True)]
+                if not records and not rf.evaluate(nsg_fields, final=True):
+                    continue
+
+            yield NsgRecord(
+                compartment_name=comp.name,
+                id=nsg.id,
+                name=nsg.display_name,
+                state=_state(nsg.lifecycle_state),
+                rules=tuple(records)
+            )
+
+
+def collect_exposures(ctx, protocol, port, cidr="0.0.0.0/0", stats=None):
+    """protocol/port 인바운드를 cidr 전체에서 허용하는 NSG / Security List 별 ExposureRecord
+
+    protocol 은 프로토콜 번호("6", "17", "1", "all"), port 가 None 이면 포트 무관.
+    ctx 의 --name / --filter 는 룰 소유자(NSG / Security List)와 룰 peer(ip)에 적용한다.
+    stats(dict)를 넘기면 rules / build_ms / query_ms 를 채운다.
+    """
+    graph = ctx.prepare("exposures")
+    if isinstance(cidr, str):
+        cidr = parse_cidr_arg(cidr)
+    ctx.deadline.begin("exposures")
+    rule_records = collect_security_rules(
+        ctx.virtual_network_client, ctx.compartments, ctx.workers, ctx.name_filter,
+        journal=ctx.journal, deadline=ctx.deadline,
+        resource_filter=ctx.resource_filter, comp_fields_map=ctx.comp_fields_map
+    )
+
+    started = time.perf_counter()
+    rule_index = RuleIndex(rule_records)
+    built = time.perf_counter()
+    hits = rule_index.query("INGRESS", protocol, port, cidr)
+    queried = time.perf_counter()
+    if stats is not None:
+        stats.update(
+            rules=len(rule_records),
+            build_ms=(built - started) * 1000,
+            query_ms=(queried - built) * 1000
+        )
+
+    # 룰 소유자(NSG / Security List) 별로 묶기
+    hits_by_owner = {}
+    for rec in hits:
+        hits_by_owner.setdefault(rec.owner_id, []).append(rec)
+
+    # NSG -> 소속 VNIC 의 인스턴스, Security List -> 사용하는 서브넷의 인스턴스 (그래프 관계)
+    for owner_id, recs in hits_by_owner.items():
+        owner = recs[0]
+        if owner.owner_type == "NSG":
+            inst_ids = graph.instances_in_nsg(owner_id)
         else:
-            console.print("(No Instances Matched)")
+            inst_ids = set()
+            for subnet_id in graph.incoming(owner_id, EDGE_SECURITY_LIST):
+                inst_ids |= graph.instances_in_subnet(subnet_id)
+
+        yield ExposureRecord(
+            compartment_name=owner.compartment_name,
+            owner_type=owner.owner_type,
+            owner_id=owner_id,
+            owner_name=owner.owner_name,
+            rules=tuple(recs),
+            instances=tuple(sorted(graph.name_of(i) for i in inst_ids))
+        )
 
-    # 2) LB
-    if show_lb:
-        lb_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
-        lb_table.add_column("Compartment", style="bold magenta")
-        lb_table.add_column("LB Name", style="bold cyan")
-        lb_table.add_column("LB State", justify="center")
-        lb_table.add_column("IP Addresses")
-        lb_table.add_column("Shape")
-        lb_table.add_column("Type")
-        lb_table.add_column("Backend Set")
-        lb_table.add_column("Backend Target")
-
-        console.print("\n[bold underline]Load Balancer Info[/bold underline]")
-        if lb_rows:
-            current_comp = None
-            for row in lb_rows:
-                if row["compartment_name"] != current_comp:
-                    if current_comp is not None:
-                        lb_table.add_section()
-                    current_comp = row["compartment_name"]
-
-                lb_state = row["lb_state"]
-                color = lb_state_map.get(lb_state, "white")
-                colored_lb_state = f"[{color}]{lb_state}[/{color}]"
-
-                lb_table.add_row(
-                    row["compartment_name"],
-                    row["lb_name"],
-                    colored_lb_state,
-                    row["ip_addrs"],
-                    row["shape"],
-                    row["lb_type"],
-                    row["backend_set"],
-                    row["backend_target"]
+
+def collect_attached(ctx, subnet):
+    """서브넷(이름 또는 OCID)에 붙은 VNIC / 인스턴스 / 볼륨 / NSG / LB"""
+    graph = ctx.prepare("attached")
+    for subnet_id in ctx.find_subnets(subnet):
+        for node_id in graph.attached_to_subnet(subnet_id):
+            node = graph.nodes.get(node_id)
+            yield AttachedRecord(
+                subnet=graph.name_of(subnet_id),
+                kind=node.kind if node is not None else None,
+                id=node_id,
+                name=graph.name_of(node_id),
+                compartment_name=ctx.comp_name(node.compartment_id) if node is not None else None
+            )
+
+
+def _volume_record(ctx, vol, attached_to=None):
+    return VolumeRecord(
+        compartment_name=ctx.comp_name(vol.compartment_id),
+        id=vol.id,
+        name=vol.name,
+        kind=vol.kind,
+        state=_state(vol.state),
+        size_gb=vol.size_gb,
+        availability_domain=vol.ad,
+        attached_to=attached_to
+    )
+
+
+def collect_orphaned_volumes(ctx):
+    """어떤 인스턴스에도 붙어 있지 않은 (부팅) 볼륨"""
+    graph = ctx.prepare("orphans")
+    for vol in graph.orphaned_volumes():
+        if ctx.selected(vol):
+            yield _volume_record(ctx, vol)
+
+
+def collect_unused_nsgs(ctx):
+    """VNIC 도 LB 도 사용하지 않는 NSG (rules 는 조회하지 않음)"""
+    graph = ctx.prepare("orphans")
+    for nsg in graph.unused_nsgs():
+        if ctx.selected(nsg):
+            yield NsgRecord(
+                compartment_name=ctx.comp_name(nsg.compartment_id),
+                id=nsg.id,
+                name=nsg.name,
+                state=_state(nsg.state),
+                rules=None
+            )
+
+
+def collect_volumes(ctx):
+    """부팅 / 블록 볼륨 (붙어 있는 인스턴스 이름 포함)"""
+    graph = ctx.prepare("volumes")
+    for vol in graph.of_kind(KIND_BOOT_VOLUME, KIND_VOLUME):
+        if not ctx.selected(vol):
+            continue
+        # 붙어있는 인스턴스 (여러개가 붙을 수 있지만 일반적으로 1개)
+        edge = EDGE_BOOT_VOLUME if vol.kind == KIND_BOOT_VOLUME else EDGE_VOLUME
+        owners = graph.incoming(vol.id, edge)
+        yield _volume_record(ctx, vol, graph.name_of(owners[0]) if owners else None)
+
+
+def collect_buckets(ctx):
+    """BucketRecord (오브젝트 목록을 끝까지 읽어 크기/개수 합산, namespace 조회 실패 시 예외)"""
+    if ctx.compartments is None:
+        ctx.load_compartments()
+    client = ctx.object_storage_client
+    namespace = ctx.namespace
+    rf = ctx.resource_filter
+
+    # tag 조건이 있으면 list_buckets 응답에 태그를 포함시킴
+    bkt_list_kwargs = {}
+    if rf and rf.references("tag"):
+        bkt_list_kwargs["fields"] = ["tags"]
+    bkt_key = _list_kwargs_key(bkt_list_kwargs)
+    deadline = ctx.deadline
+    deadline.begin("buckets")
+
+    for comp in ctx.compartments:
+        if deadline.expired():
+            deadline.mark(comp.name)
+            continue
+        try:
+            buckets = ctx.journal.cached(("buckets", comp.id, bkt_key), lambda: client.list_buckets(
+                namespace_name=namespace,
+                compartment_id=comp.id,
+                **bkt_list_kwargs
+            ).data)
+        except Exception:
+            buckets = []
+
+        for bkt in buckets:
+            # --name 필터
+            if ctx.name_filter and (ctx.name_filter not in bkt.name.lower()):
+                continue
+
+            # --filter: 오브젝트 전체 스캔(가장 비싼 작업) 전에 평가, size 조건은 스캔 후 평가
+            if rf:
+                bkt_fields = dict(
+                    ctx.comp_fields_map[comp.id],
+                    name=bkt.name,
+                    tags=_tag_fields(bkt),
                 )
-            console.print(lb_table)
-        else:
-            console.print("(No Load Balancers Matched)")
+                if rf.evaluate(bkt_fields) is False:
+                    continue
 
-    # 3) NSG
-    if show_nsg:
-        nsg_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
-        nsg_table.add_column("Compartment", style="bold magenta")
-        nsg_table.add_column("NSG Name", style="bold cyan")
-        nsg_table.add_column("Rule Desc", justify="left")
-        nsg_table.add_column("Protocol", justify="left")
-        nsg_table.add_column("Port Range", justify="left")
-        nsg_table.add_column("Source")
-
-        console.print("\n[bold underline]NSG Inbound Rules[/bold underline]")
-        if nsg_rows:
-            current_comp = None
-            for row in nsg_rows:
-                if row["compartment_name"] != current_comp:
-                    if current_comp is not None:
-                        nsg_table.add_section()
-                    current_comp = row["compartment_name"]
-
-                nsg_table.add_row(
-                    row["compartment_name"],
-                    row["nsg_name"],
-                    row["desc"],
-                    row["proto"],
-                    row["port_range"],
-                    row["source"]
+            # 마감: 스캔을 시작하지 못한 버킷은 컴파트먼트째 미완료로 표시하고 건너뜀
+            if deadline.expired():
+                deadline.mark(comp.name)
+                continue
+
+            # 스캔을 끝낸 버킷은 journal 에서 복원, 스캔 중이던 버킷은 마지막 페이지부터 이어서 읽음
+            key = ("bucket", comp.id, bkt.name)
+            try:
+                info = ctx.journal.cached(
+                    key, lambda: _scan_bucket(client, namespace, bkt.name, ctx.journal, key, deadline)
                 )
-            console.print(nsg_table)
+            except DeadlineExceeded as e:
+                # 스캔 도중 마감: 지금까지의 합계(하한값)로 표시, journal 에는 완료로 남기지 않음
+                info = e.partial
+                deadline.mark(f"{comp.name}/{bkt.name}", "bucket_scan")
+
+            record = BucketRecord(
+                compartment_name=comp.name,
+                id=info["id"],
+                name=bkt.name,
+                public_access_type=info["access"],
+                storage_tier=info["tier"],
+                size_bytes=info["size"],
+                object_count=info["count"]
+            )
+            if rf:
+                bkt_fields["size"] = record.size_gb
+                if not rf.evaluate(bkt_fields, final=True):
+                    continue
+            yield record
+
+
+def _scan_bucket(client, namespace, bucket_name, journal=_NULL_JOURNAL, key=None, deadline=None):
+    """버킷 get + 오브젝트 전체 스캔 -> {id, access, tier, size, count}
+
+    페이지마다 다음 시작 위치와 누적 합계를 journal 에 남겨, 중단돼도 그 페이지부터 이어서 읽는다.
+    get / list 가 실패하면 그때까지의 결과를 담아 IncompleteUnit.
+    다음 페이지를 읽기 전에 deadline 이 지나 있으면 중간 합계를 담아 DeadlineExceeded.
+    """
+    # 버킷 get: public_access_type, storage_tier
+    # 하지만 approximate_size/approximate_count는 null일 수 있음
+    info = {"id": None, "access": "NoPublicAccess", "tier": None, "size": 0, "count": 0}
+    complete = True
+    try:
+        bkt_detail = client.get_bucket(namespace_name=namespace, bucket_name=bucket_name).data
+        info["id"] = getattr(bkt_detail, "id", None)
+        if bkt_detail.public_access_type:
+            info["access"] = bkt_detail.public_access_type
+        info["tier"] = bkt_detail.storage_tier or None
+    except Exception:
+        complete = False
+
+    # 버킷 내 실제 오브젝트 합산
+    next_start = None
+    progress = journal.page(key) if key else None
+    if progress:
+        next_start, info["size"], info["count"] = progress
+
+    # list_objects() → while loop로 페이지네이션
+    while True:
+        try:
+            list_resp = client.list_objects(
+                namespace_name=namespace,
+                bucket_name=bucket_name,
+                start=next_start,
+                limit=1000,  # 한 페이지 최대 건수
+                fields="size,etag"
+            )
+        except Exception:
+            complete = False
+            break
+
+        objs = list_resp.data.objects or []
+        info["count"] += len(objs)
+
+        for obj in objs:
+            info["size"] += obj.size or 0
+
+        # 다음 페이지가 있는지 확인
+        if list_resp.data.next_start_with:
+            next_start = list_resp.data.next_start_with
+            if key:
+                journal.record_page(key, next_start, info["size"], info["count"])
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(info)
         else:
-            console.print("(No NSG Matched)")
+            break
+    if not complete:
+        # 실패한 조회가 있으면 지금까지의 합계로 표시하고, --resume 때 마지막 페이지부터 다시 읽음
+        raise IncompleteUnit(info)
+    return info
+
+
+# 인스턴스 사용률 (--utilization): Monitoring API 를 인스턴스마다가 아니라 컴파트먼트 x 쿼리마다 1번,
+# resourceId 로 groupBy 한 MQL 로 조회한다. 일 단위 값이라 인스턴스 수와 관계없이 호출 수가 일정하다.
+_UTILIZATION_NAMESPACE = "oci_computeagent"
+
+# (UtilizationRecord 필드, 메트릭, 일 단위 통계, 일별 값 -> 기간 값)
+_UTILIZATION_QUERIES = (
+    ("cpu_avg", "CpuUtilization", "mean", lambda values: sum(values) / len(values)),
+    ("cpu_max", "CpuUtilization", "max", max),
+    ("memory_avg", "MemoryUtilization", "mean", lambda values: sum(values) / len(values)),
+    ("memory_max", "MemoryUtilization", "max", max),
+    ("network_in_gb", "NetworksBytesIn", "sum", lambda values: sum(values) / 1024 ** 3),
+    ("network_out_gb", "NetworksBytesOut", "sum", lambda values: sum(values) / 1024 ** 3),
+)
+
+
+def _summarize_metric(monitoring_client, comp_id, metric, statistic, start_time, end_time):
+    """컴파트먼트 1개의 메트릭을 resourceId 별 일 단위 값으로 -> {OCID(소문자): [값, ...]}"""
+    from oci.monitoring.models import SummarizeMetricsDataDetails
+    details = SummarizeMetricsDataDetails(
+        namespace=_UTILIZATION_NAMESPACE,
+        query=f"{metric}[1d].groupBy(resourceId).{statistic}()",
+        start_time=start_time,
+        end_time=end_time,
+        resolution="1d"
+    )
+    series = {}
+    for data in monitoring_client.summarize_metrics_data(
+        compartment_id=comp_id, summarize_metrics_data_details=details
+    ).data:
+        resource_id = (data.dimensions or {}).get("resourceId")
+        if resource_id:
+            values = [point.value for point in (data.aggregated_datapoints or []) if point.value is not None]
+            series.setdefault(resource_id.lower(), []).extend(values)
+    return series
+
+
+def collect_utilization(ctx, days=7):
+    """UtilizationRecord (선택된 인스턴스의 최근 days 일 CPU / 메모리 사용률, 네트워크 전송량)
+
+    조회 결과는 (쿼리, 컴파트먼트, 기간) 단위로 ctx 에 캐시하고 journal 에도 기록한다.
+    메모리 사용률 등은 Compute Instance Monitoring 플러그인이 켜진 인스턴스만 값이 있다.
+    """
+    graph = ctx.prepare("instances")
+    instances = [
+        inst for inst in graph.of_kind(KIND_INSTANCE)
+        if inst.state != "TERMINATED" and ctx.selected(inst)
+    ]
+    comp_ids = sorted({inst.compartment_id for inst in instances})
+    ctx.deadline.begin("utilization")
+
+    end_time = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_time = end_time - datetime.timedelta(days=days)
+
+    def fetch(field, metric, statistic, comp_id):
+        key = (field, comp_id, days)
+        if key not in ctx._metric_cache:
+            try:
+                ctx._metric_cache[key] = ctx.journal.cached(("metric",) + key, lambda: _summarize_metric(
+                    ctx.monitoring_client, comp_id, metric, statistic, start_time, end_time
+                ))
+            except Exception as e:
+                ctx._warn(f"[yellow][WARN][/yellow] Monitoring {metric} 조회 실패: {e}")
+                ctx._metric_cache[key] = {}
+        return field, ctx._metric_cache[key]
+
+    # 마감 시 끝나지 않은 컴파트먼트는 deadline 에 표시 (해당 인스턴스의 사용률 셀은 '?')
+    values = {field: {} for field, _, _, _ in _UTILIZATION_QUERIES}
+    tasks = [
+        (ctx.comp_name(comp_id), functools.partial(fetch, field, metric, statistic, comp_id))
+        for field, metric, statistic, _ in _UTILIZATION_QUERIES
+        for comp_id in comp_ids
+    ]
+    for field, series in _gather(tasks, ctx.workers, ctx.deadline):
+        values[field].update(series)
+
+    reducers = {field: reduce for field, _, _, reduce in _UTILIZATION_QUERIES}
+    for inst in instances:
+        key = inst.id.lower()
+        fields = {
+            field: reducers[field](series[key]) if series.get(key) else None
+            for field, series in values.items()
+        }
+        if any(value is not None for value in fields.values()):
+            yield UtilizationRecord(id=inst.id, **fields)
+
+
+# -----------------------------------------------------------------------------
+# 렌더링 (색상/문자열 변환은 여기서만)
+# -----------------------------------------------------------------------------
+STATE_COLORS = {
+    "RUNNING": "green",
+    "STOPPED": "yellow",
+    "STOPPING": "yellow",
+    "STARTING": "cyan",
+    "PROVISIONING": "cyan",
+    "TERMINATED": "red",
+    "AVAILABLE": "green"
+}
+LB_STATE_COLORS = {
+    "ACTIVE": "green",
+    "PROVISIONING": "cyan",
+    "FAILED": "red",
+    "UPDATING": "yellow",
+    "TERMINATED": "red"
+}
+HEALTH_COLORS = {
+    "OK": "green",
+    "WARNING": "yellow",
+    "CRITICAL": "red",
+    "UNKNOWN": "white"
+}
+# public_access_type: NoPublicAccess 노랑, 그외(예: ObjectRead, ObjectReadWrite 등) 초록
+ACCESS_COLORS = {
+    "NoPublicAccess": "yellow",
+}
+
+
+def _text(value):
+    """레코드 값 -> 셀 문자열 (None 은 '-', enum 은 값)"""
+    if value is None:
+        return "-"
+    if isinstance(value, enum.Enum):
+        return value.value
+    return str(value)
+
+
+def _colored(value, color_map, default="white"):
+    text = _text(value)
+    color = color_map.get(text, default)
+    return f"[{color}]{text}[/{color}]"
+
+
+# 마감(--deadline)으로 끝까지 조회하지 못한 셀
+_INCOMPLETE_CELL = "[yellow]?[/yellow]"
+
+
+def _bucket_size_cells(rec, incomplete=False):
+    """버킷 크기/개수 셀, 스캔을 끝내지 못했으면 지금까지의 합계를 하한값(≥)으로"""
+    size, count = f"{rec.size_gb:.2f}GB", str(rec.object_count)
+    if incomplete:
+        return (f"[yellow]≥{size}[/yellow]", f"[yellow]≥{count}[/yellow]")
+    return (size, count)
+
+
+def _by_comp_and_name(rec):
+    return (rec.compartment_name.lower(), rec.name.lower())
+
+
+# --sort 별칭 -> 레코드 속성
+_SORT_ALIASES = {
+    "compartment": "compartment_name",
+    "size": "size_gb",
+    "memory": "memory_gb",
+    "ad": "availability_domain",
+    "ip": "private_ip",
+    "count": "object_count",
+    "owner": "owner_name",
+}
+_WIDTH_SAMPLE = 200     # 페이지 출력에서 컬럼 폭 계산에 쓰는 앞쪽 행 수
+
+
+def _record_fields(record_type):
+    """--sort 로 쓸 수 있는 레코드 속성 (필드 + property)"""
+    return set(record_type.__slots__) | {
+        name for name, value in vars(record_type).items() if isinstance(value, property)
+    }
 
-    # 4) 볼륨 (부팅)
-    if show_volume:
-        # 4-1) 부팅 볼륨
-        boot_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
-        boot_table.add_column("Compartment", style="bold magenta")
-        boot_table.add_column("Volume Name", style="bold cyan")
-        boot_table.add_column("State", justify="center")
-        boot_table.add_column("Size(GB)", justify="right")
-        boot_table.add_column("Attached To")
-
-        console.print("\n[bold underline]Boot Volumes[/bold underline]")
-        if boot_rows:
-            current_comp = None
-            for row in boot_rows:
-                if row["compartment_name"] != current_comp:
-                    if current_comp is not None:
-                        boot_table.add_section()
-                    current_comp = row["compartment_name"]
-
-                boot_table.add_row(
-                    row["compartment_name"],
-                    row["volume_name"],
-                    row["state"],
-                    str(row["size_gb"]),
-                    row["attached"]
-                )
-            console.print(boot_table)
+
+def _sort_attr(spec):
+    """--sort 값 -> 레코드 속성 이름 (별칭 적용, 부호 제거)"""
+    field = spec.lstrip("-+").lower()
+    return _SORT_ALIASES.get(field, field)
+
+
+def parse_sort_arg(spec):
+    """argparse type: 어느 레코드에도 없는 --sort 필드는 거부"""
+    known = set()
+    for record_type in (InstanceRecord, LoadBalancerRecord, NsgRecord, VolumeRecord, BucketRecord,
+                        ExposureRecord, AttachedRecord):
+        known |= _record_fields(record_type)
+    if _sort_attr(spec) not in known:
+        raise argparse.ArgumentTypeError(f"알 수 없는 정렬 필드: {spec!r}")
+    return spec
+
+
+def _positive_int(value):
+    """argparse type: 1 이상의 정수"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"정수가 아닙니다: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1 이상이어야 합니다: {value!r}")
+    return number
+
+
+class _Descending:
+    """heapq 키에서 한 값만 역순으로 비교 (나머지 키는 오름차순 유지)"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class TableView:
+    """대용량 결과용 테이블 출력 설정 (--page-size, --sort, --limit)
+
+    정렬/개수 제한은 레코드 단계에서 한다. --page-size 가 없으면 기존처럼 테이블 하나로 전부 출력하고,
+    있으면 행(셀 문자열)을 페이지 단위로만 만든다. 페이지 출력의 컬럼 폭은 앞쪽 _WIDTH_SAMPLE 행으로 정하고
+    더 긴 셀이 나오면 그 페이지부터 넓히므로, rich 는 보이는 페이지만 측정/렌더링한다.
+    TTY 에서는 페이지마다 Enter 를 기다린다.
+    """
+
+    def __init__(self, page_size=None, sort=None, limit=None, interactive=None):
+        self.page_size = page_size
+        self.descending = bool(sort) and sort.startswith("-")
+        self.sort_field = _sort_attr(sort) if sort else None
+        self.limit = limit
+        self.interactive = interactive
+
+    @property
+    def grouped(self):
+        """기본 정렬(컴파트먼트, 이름)일 때만 컴파트먼트별 구분선"""
+        return self.sort_field is None
+
+    def for_type(self, record_type):
+        """record_type 테이블용 설정: --sort 필드가 없는 레코드면 정렬만 기본으로 (페이지 / 개수 제한은 그대로)"""
+        if self.sort_field is None or self.sort_field in _record_fields(record_type):
+            return self
+        return TableView(page_size=self.page_size, limit=self.limit, interactive=self.interactive)
+
+    def order(self, records, default_key=_by_comp_and_name):
+        """--sort 필드 순(같으면 기본 키 순), 값이 없는 레코드는 뒤로. --limit 이 있으면 전체 정렬 없이 상위 N개만"""
+        field = self.sort_field
+        limit = self.limit
+        if field is None:
+            if limit is None:
+                return sorted(records, key=default_key)
+            return heapq.nsmallest(limit, records, key=default_key)
+
+        def value_of(rec):
+            value = getattr(rec, field, None)
+            return value.lower() if isinstance(value, str) else value
+
+        present = []
+        missing = []    # 값이 없는 레코드는 항상 뒤로
+        for rec in records:
+            (missing if value_of(rec) is None else present).append(rec)
+        if limit is None:
+            present.sort(key=default_key)
+            present.sort(key=value_of, reverse=self.descending)
+            return present + sorted(missing, key=default_key)
+        if self.descending:
+            top = heapq.nsmallest(limit, present, key=lambda rec: (_Descending(value_of(rec)), default_key(rec)))
         else:
-            console.print("(No Boot Volumes Matched)")
-
-        # 4-2) 블록 볼륨
-        block_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
-        block_table.add_column("Compartment", style="bold magenta")
-        block_table.add_column("Volume Name", style="bold cyan")
-        block_table.add_column("State", justify="center")
-        block_table.add_column("Size(GB)", justify="right")
-        block_table.add_column("Attached To")
-
-        console.print("\n[bold underline]Block Volumes[/bold underline]")
-        if block_rows:
-            current_comp = None
-            for row in block_rows:
-                if row["compartment_name"] != current_comp:
-                    if current_comp is not None:
-                        block_table.add_section()
-                    current_comp = row["compartment_name"]
-
-                block_table.add_row(
-                    row["compartment_name"],
-                    row["volume_name"],
-                    row["state"],
-                    str(row["size_gb"]),
-                    row["attached"]
-                )
-            console.print(block_table)
+            top = heapq.nsmallest(limit, present, key=lambda rec: (value_of(rec), default_key(rec)))
+        return top + heapq.nsmallest(limit - len(top), missing, key=default_key)
+
+    def print_table(self, console, columns, rows, show_lines=False):
+        """columns: [(헤더, add_column 옵션)], rows: (그룹, 셀 튜플) 이터러블 (지연 생성 가능)"""
+        rows = iter(rows)
+        page_size = self.page_size
+        if page_size:
+            sample = list(itertools.islice(rows, _WIDTH_SAMPLE))
+            widths = [cell_len(header) for header, _ in columns]
+            rows = itertools.chain(sample, rows)
+            interactive = self.interactive
+            if interactive is None:
+                interactive = console.is_terminal and sys.stdin.isatty()
         else:
-            console.print("(No Block Volumes Matched)")
+            # 기본: 테이블 하나 (rich 가 전체 행으로 폭 계산)
+            sample = []
+            widths = None
+            interactive = False
+
+        page = list(itertools.islice(rows, page_size or None))
+        shown = 0
+        current_group = None
+        first = True
+        while page:
+            fixed = None
+            if widths is not None:
+                # 폭은 줄이지 않고 이 페이지(첫 페이지는 앞쪽 샘플 포함)의 가장 긴 셀까지 넓힌다
+                for _, cells in (sample if first else page):
+                    for i, cell in enumerate(cells):
+                        plain = Text.from_markup(cell).plain
+                        widths[i] = max(widths[i], max(cell_len(line) for line in plain.split("\n")))
+                # 표 전체 폭(여백/구분자 포함)이 콘솔보다 넓으면 고정하지 않고 rich 가 페이지 안에서 줄이게 둔다
+                if sum(widths) + 3 * len(widths) + 1 <= console.width:
+                    fixed = widths
+            table = Table(show_lines=show_lines, box=box.SIMPLE_HEAVY, show_header=first or interactive)
+            for (header, options), width in zip(columns, fixed or [None] * len(columns)):
+                table.add_column(header, width=width, **options)
+            for group, cells in page:
+                if self.grouped and group != current_group:
+                    if current_group is not None and table.row_count:
+                        table.add_section()
+                    current_group = group
+                table.add_row(*cells)
+            console.print(table)
+            shown += len(page)
+            first = False
+
+            if not page_size:
+                break
+            page = list(itertools.islice(rows, page_size))
+            if page and interactive:
+                try:
+                    answer = console.input(f"[dim]-- {shown}행 표시됨, Enter: 다음 페이지 / q: 그만 --[/dim] ")
+                except (EOFError, KeyboardInterrupt):
+                    answer = "q"
+                if answer.strip().lower().startswith("q"):
+                    break
 
-    # 5) 오브젝트 스토리지(버킷)
-    if show_object:
-        obj_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
-        obj_table.add_column("Compartment", style="bold magenta")
-        obj_table.add_column("Bucket Name", style="bold cyan")
-        obj_table.add_column("Access", justify="left")         # 색상 추가
-        obj_table.add_column("Storage Tier", justify="left")   
-        obj_table.add_column("Size(GB)", justify="right")      # 직접 계산한 합계
-        obj_table.add_column("Object Count", justify="right")  # 직접 계산한 오브젝트 개수
-
-        console.print("\n[bold underline]Object Storage Buckets[/bold underline]")
-        if object_rows:
-            current_comp = None
-            for row in object_rows:
-                if row["compartment_name"] != current_comp:
-                    if current_comp is not None:
-                        obj_table.add_section()
-                    current_comp = row["compartment_name"]
-
-                obj_table.add_row(
-                    row["compartment_name"],
-                    row["bucket_name"],
-                    row["access_colored"],
-                    row["tier"],
-                    row["approx_size"],
-                    row["approx_count"]
+
+_DEFAULT_VIEW = TableView(interactive=False)
+
+
+def _utilization_cells(rec, incomplete=False):
+    """UtilizationRecord -> (CPU%, Mem%, Net In/Out) 셀, 값이 없으면 '-' (조회를 못 끝냈으면 '?')"""
+    empty = _INCOMPLETE_CELL if incomplete else "-"
+    if rec is None:
+        return (empty,) * 3
+
+    def pair(first, second, fmt):
+        if first is None and second is None:
+            return empty
+        return " / ".join(empty if v is None else fmt.format(v) for v in (first, second))
+
+    return (
+        pair(rec.cpu_avg, rec.cpu_max, "{:.1f}"),
+        pair(rec.memory_avg, rec.memory_max, "{:.1f}"),
+        pair(rec.network_in_gb, rec.network_out_gb, "{:.2f}"),
+    )
+
+
+def render_instances(console, records, view=None, costs=None, utilization=None, incomplete=None):
+    view = (view or _DEFAULT_VIEW).for_type(InstanceRecord)
+    console.print("[bold underline]Instance Info[/bold underline]")
+    if not records:
+        console.print("(No Instances Matched)")
+        return
+
+    columns = [
+        ("Compartment", {"style": "bold magenta"}),
+        ("Instance Name", {"style": "bold cyan"}),
+        ("State", {"justify": "center"}),
+        ("Subnet", {}),
+        ("NSG", {}),
+        ("Private IP", {}),
+        ("Public IP", {}),
+        ("Shape", {}),
+        ("vCPUs", {"justify": "right"}),
+        ("Memory(GB)", {"justify": "right"}),
+        ("Boot Volume", {"justify": "left"}),
+        ("Block Volumes", {"justify": "left"}),
+    ]
+    if utilization is not None:
+        # utilization: {인스턴스 OCID: UtilizationRecord} (--utilization),
+        # incomplete: 마감으로 사용률을 끝까지 조회하지 못한 컴파트먼트 이름 (값이 없으면 '?')
+        columns += [
+            ("CPU% avg/max", {"justify": "right"}),
+            ("Mem% avg/max", {"justify": "right"}),
+            ("Net In/Out(GB)", {"justify": "right"}),
+        ]
+    if costs is not None:
+        columns.append(("Cost($)", {"justify": "right"}))
+    rows = (
+        (rec.compartment_name, (
+            rec.compartment_name,
+            rec.name,
+            _colored(rec.state, STATE_COLORS),
+            _text(rec.subnet),
+            ",".join(rec.nsgs) or "-",
+            rec.private_ip or "-",
+            rec.public_ip or "-",
+            _text(rec.shape),
+            _text(rec.vcpus),
+            _text(rec.memory_gb),
+            f"{rec.boot_volume_gb}GB" if rec.boot_volume_gb is not None else "-",
+            ", ".join(f"{gb}GB" for gb in rec.block_volume_gb) or "-"
+        )
+            + (_utilization_cells(utilization.get(rec.id), rec.compartment_name in (incomplete or ()))
+               if utilization is not None else ())
+            + ((_cost_cell(costs, rec.id),) if costs is not None else ()))
+        for rec in view.order(records)
+    )
+    view.print_table(console, columns, rows)
+
+
+def render_load_balancers(console, records, with_health=False, view=None, costs=None, incomplete=None):
+    """incomplete: 마감으로 헬스를 조회하지 못한 "컴파트먼트/LB" (Health '?')"""
+    view = (view or _DEFAULT_VIEW).for_type(LoadBalancerRecord)
+    console.print("\n[bold underline]Load Balancer Info[/bold underline]")
+    if not records:
+        console.print("(No Load Balancers Matched)")
+        return
+
+    columns = [
+        ("Compartment", {"style": "bold magenta"}),
+        ("LB Name", {"style": "bold cyan"}),
+        ("LB State", {"justify": "center"}),
+        ("IP Addresses", {}),
+        ("Shape", {}),
+        ("Type", {}),
+    ]
+    if costs is not None:
+        columns.append(("Cost($)", {"justify": "right"}))
+    columns += [
+        ("Backend Set", {}),
+        ("Backend Target", {}),
+    ]
+    if with_health:
+        columns.append(("Health", {"justify": "center"}))
+    no_health = [_colored(None, HEALTH_COLORS)] if with_health else []
+
+    def rows():
+        for rec in view.order(records):
+            unknown_health = f"{rec.compartment_name}/{rec.name}" in (incomplete or ())
+            base = [
+                rec.compartment_name,
+                rec.name,
+                _colored(rec.state, LB_STATE_COLORS),
+                ", ".join(ip or "-" for ip in rec.ip_addresses) or "-",
+                rec.shape or "-",
+                "PRIVATE" if rec.is_private else "PUBLIC",
+            ]
+            if costs is not None:
+                base.append(_cost_cell(costs, rec.id))
+            if not rec.backend_sets:
+                yield rec.compartment_name, base + ["(No Backend Sets)", "-"] + no_health
+                continue
+            for set_name in sorted(rec.backend_sets, key=str.lower):
+                backends = [b for b in rec.backends if b.backend_set == set_name]
+                if not backends:
+                    yield rec.compartment_name, base + [set_name, "(No Backends)"] + no_health
+                    continue
+                for backend in backends:
+                    if not with_health:
+                        health = []
+                    elif unknown_health:
+                        health = [_INCOMPLETE_CELL]
+                    else:
+                        health = [_colored(backend.health, HEALTH_COLORS)]
+                    yield rec.compartment_name, base + [set_name, backend.target] + health
+
+    view.print_table(console, columns, rows())
+
+
+def render_nsg_rules(console, records, view=None):
+    view = (view or _DEFAULT_VIEW).for_type(NsgRecord)
+    console.print("\n[bold underline]NSG Rules[/bold underline]")
+    if not records:
+        console.print("(No NSG Matched)")
+        return
+
+    columns = [
+        ("Compartment", {"style": "bold magenta"}),
+        ("NSG Name", {"style": "bold cyan"}),
+        ("Direction", {"justify": "center"}),
+        ("Rule Desc", {"justify": "left"}),
+        ("Protocol", {"justify": "left"}),
+        ("Port Range", {"justify": "left"}),
+        ("Source/Dest", {}),
+    ]
+
+    def rows():
+        for rec in view.order(records):
+            if not rec.rules:
+                yield rec.compartment_name, (rec.compartment_name, rec.name, "-", "(No Rules)", "-", "-", "-")
+                continue
+            for rule in rec.rules:
+                yield rec.compartment_name, (
+                    rec.compartment_name,
+                    rec.name,
+                    rule.direction,
+                    rule.description or "-",
+                    _protocol_name(rule.protocol),
+                    rule.port_str,
+                    rule.peer or "-"
                 )
-            console.print(obj_table)
+
+    view.print_table(console, columns, rows())
+
+
+def render_exposures(console, records, protocol, port, cidr, stats=None, view=None):
+    view = (view or _DEFAULT_VIEW).for_type(ExposureRecord)
+    port_label = "*" if port is None else port
+    console.print(
+        f"\n[bold underline]Exposure: {port_label}/{_protocol_name(protocol)} "
+        f"from {cidr}[/bold underline]"
+    )
+    if stats:
+        console.print(
+            f"[dim]{stats['rules']} rules indexed in {stats['build_ms']:.1f}ms, "
+            f"query {stats['query_ms']:.2f}ms[/dim]"
+        )
+    if not records:
+        console.print("(No Exposure Found)")
+        return
+
+    columns = [
+        ("Compartment", {"style": "bold magenta"}),
+        ("Type", {"justify": "center"}),
+        ("Name", {"style": "bold cyan"}),
+        ("Matching Rules", {}),
+        ("Instances", {}),
+    ]
+    rows = (
+        (None, (
+            rec.compartment_name,
+            rec.owner_type,
+            rec.owner_name,
+            "\n".join(f"{_protocol_name(r.protocol)} {r.port_str} from {r.peer}" for r in rec.rules),
+            "\n".join(rec.instances) or "-"
+        ))
+        for rec in view.order(
+            records, lambda r: (r.compartment_name.lower(), r.owner_type, r.owner_name.lower())
+        )
+    )
+    view.print_table(console, columns, rows, show_lines=True)
+
+
+def render_attached(console, records, subnet, view=None):
+    view = (view or _DEFAULT_VIEW).for_type(AttachedRecord)
+    console.print(f"\n[bold underline]Attached To Subnet '{subnet}'[/bold underline]")
+    if not records:
+        console.print("(Nothing Attached)")
+        return
+
+    columns = [
+        ("Subnet", {"style": "bold magenta"}),
+        ("Kind", {"justify": "center"}),
+        ("Name", {"style": "bold cyan"}),
+        ("Compartment", {}),
+    ]
+    rows = (
+        (None, (rec.subnet, _text(rec.kind), rec.name, _text(rec.compartment_name)))
+        for rec in view.order(records, lambda r: (r.subnet.lower(), r.kind or "", r.name.lower()))
+    )
+    view.print_table(console, columns, rows)
+
+
+def render_orphans(console, volume_records, nsg_records, view=None):
+    view = view or _DEFAULT_VIEW
+    volume_view = view.for_type(VolumeRecord)
+    nsg_view = view.for_type(NsgRecord)
+    console.print("\n[bold underline]Orphaned Volumes[/bold underline]")
+    if volume_records:
+        columns = [
+            ("Compartment", {"style": "bold magenta"}),
+            ("Type", {"justify": "center"}),
+            ("Volume Name", {"style": "bold cyan"}),
+            ("State", {"justify": "center"}),
+            ("Size(GB)", {"justify": "right"}),
+        ]
+        rows = (
+            (None, (
+                rec.compartment_name,
+                "Boot" if rec.kind == KIND_BOOT_VOLUME else "Block",
+                rec.name,
+                _colored(rec.state, STATE_COLORS),
+                _text(rec.size_gb)
+            ))
+            for rec in volume_view.order(volume_records)
+        )
+        volume_view.print_table(console, columns, rows)
+    else:
+        console.print("(No Orphaned Volumes)")
+
+    console.print("\n[bold underline]Unused NSGs[/bold underline]")
+    if nsg_records:
+        columns = [
+            ("Compartment", {"style": "bold magenta"}),
+            ("NSG Name", {"style": "bold cyan"}),
+        ]
+        rows = ((None, (rec.compartment_name, rec.name)) for rec in nsg_view.order(nsg_records))
+        nsg_view.print_table(console, columns, rows)
+    else:
+        console.print("(No Unused NSGs)")
+
+
+def render_volumes(console, records, view=None, costs=None):
+    """부팅 볼륨 / 블록 볼륨 테이블"""
+    view = (view or _DEFAULT_VIEW).for_type(VolumeRecord)
+    columns = [
+        ("Compartment", {"style": "bold magenta"}),
+        ("Volume Name", {"style": "bold cyan"}),
+        ("State", {"justify": "center"}),
+        ("Size(GB)", {"justify": "right"}),
+        ("Attached To", {}),
+    ]
+    if costs is not None:
+        columns.append(("Cost($)", {"justify": "right"}))
+    for kind, title, empty in (
+        (KIND_BOOT_VOLUME, "Boot Volumes", "(No Boot Volumes Matched)"),
+        (KIND_VOLUME, "Block Volumes", "(No Block Volumes Matched)"),
+    ):
+        console.print(f"\n[bold underline]{title}[/bold underline]")
+        selected = [rec for rec in records if rec.kind == kind]
+        if not selected:
+            console.print(empty)
+            continue
+
+        rows = (
+            (rec.compartment_name, (
+                rec.compartment_name,
+                rec.name,
+                _colored(rec.state, STATE_COLORS),
+                _text(rec.size_gb),
+                _text(rec.attached_to)
+            ) + ((_cost_cell(costs, rec.id),) if costs is not None else ()))
+            for rec in view.order(selected)
+        )
+        view.print_table(console, columns, rows)
+
+
+def render_buckets(console, records, view=None, costs=None, incomplete=None):
+    """incomplete: 마감으로 스캔을 끝내지 못한 "컴파트먼트/버킷" (크기/개수는 하한값 '≥')"""
+    view = (view or _DEFAULT_VIEW).for_type(BucketRecord)
+    console.print("\n[bold underline]Object Storage Buckets[/bold underline]")
+    if not records:
+        console.print("(No Buckets Matched)")
+        return
+
+    columns = [
+        ("Compartment", {"style": "bold magenta"}),
+        ("Bucket Name", {"style": "bold cyan"}),
+        ("Access", {"justify": "left"}),        # 색상 추가
+        ("Storage Tier", {"justify": "left"}),
+        ("Size(GB)", {"justify": "right"}),     # 직접 계산한 합계
+        ("Object Count", {"justify": "right"}),  # 직접 계산한 오브젝트 개수
+    ]
+    if costs is not None:
+        columns.append(("Cost($)", {"justify": "right"}))
+    rows = (
+        (rec.compartment_name, (
+            rec.compartment_name,
+            rec.name,
+            _colored(rec.public_access_type, ACCESS_COLORS, default="green"),
+            _text(rec.storage_tier),
+        ) + _bucket_size_cells(rec, f"{rec.compartment_name}/{rec.name}" in (incomplete or ()))
+            + ((_cost_cell(costs, rec.id),) if costs is not None else ()))
+        for rec in view.order(records)
+    )
+    view.print_table(console, columns, rows)
+
+
+def render_pool_stats(console, stats, pool_size):
+    """ClientFactory.pool_stats(): 요청 수 대비 새 연결 수가 적을수록 keep-alive 재사용이 잘 된 것"""
+    pool_table = Table(show_lines=False, box=box.SIMPLE_HEAVY)
+    pool_table.add_column("Endpoint", style="bold cyan")
+    pool_table.add_column("Requests", justify="right")
+    pool_table.add_column("Connections", justify="right")
+    pool_table.add_column("Reused", justify="right")
+    pool_table.add_column("Idle", justify="right")
+
+    console.print(f"\n[bold underline]HTTP Connection Pool (max {pool_size}/endpoint)[/bold underline]")
+    if not stats:
+        console.print("(No Requests)")
+        return
+    for s in stats:
+        reused = 1 - s["connections"] / s["requests"] if s["requests"] else 0.0
+        pool_table.add_row(s["host"], str(s["requests"]), str(s["connections"]), f"{reused:.0%}", str(s["idle"]))
+    console.print(pool_table)
+
+
+# deadline.incomplete 섹션 -> 요약에 쓰는 설명
+_INCOMPLETE_SECTIONS = (
+    ("graph", "리소스 그래프 (인스턴스/LB/볼륨/VNIC 목록)", "컴파트먼트"),
+    ("utilization", "사용률 (셀 '?')", "컴파트먼트"),
+    ("lb_health", "Backend 헬스 (셀 '?')", "LB"),
+    ("nsg_rules", "NSG 룰", "컴파트먼트"),
+    ("exposures", "노출 분석 룰", "컴파트먼트"),
+    ("buckets", "버킷 (스캔하지 못한 버킷 제외)", "컴파트먼트"),
+    ("bucket_scan", "버킷 스캔 중단 (크기/개수는 하한값 '≥')", "버킷"),
+    ("cost", "리소스별 비용 (일부 라인 아이템만 합산)", ""),
+)
+
+
+def render_incomplete(console, deadline):
+    """마감으로 끝까지 조회하지 못한 섹션 / 컴파트먼트 / 버킷 요약"""
+    if not deadline.incomplete:
+        return
+    limits = ", ".join(
+        f"{flag} {seconds:g}s" for flag, seconds in (
+            ("--deadline", deadline.seconds), ("--section-deadline", deadline.section_seconds)
+        ) if seconds
+    )
+    console.print(f"\n[bold yellow]시간 제한({limits})으로 일부 결과가 빠졌습니다[/bold yellow]")
+    for section, title, unit in _INCOMPLETE_SECTIONS:
+        labels = deadline.incomplete.get(section)
+        if labels:
+            names = f"{unit} " + ", ".join(labels) if unit else ", ".join(labels)
+            console.print(f"[yellow]  {title}: {names}[/yellow]")
+
+
+def get_lb_backend_health(loadbalancer_client, lb):
+    """LoadBalancerNode 의 (backend set 이름, backend 이름) -> 헬스 상태 (OK/WARNING/CRITICAL/UNKNOWN)
+
+    get_load_balancer_health 1회로 LB 전체 상태를 보고, OK가 아닌 backend set만
+    get_backend_set_health 로 backend 단위 상태를 조회한다.
+    """
+    health = {}
+    try:
+        lb_health = loadbalancer_client.get_load_balancer_health(lb.id).data
+    except Exception:
+        return health
+
+    bad_sets = set(
+        (lb_health.warning_state_backend_set_names or [])
+        + (lb_health.critical_state_backend_set_names or [])
+        + (lb_health.unknown_state_backend_set_names or [])
+    )
+
+    for bs_name, backends in lb.backend_sets:
+        names = [backend[0] for backend in backends]
+        if bs_name not in bad_sets:
+            for name in names:
+                health[(bs_name, name)] = "OK"
+            continue
+
+        try:
+            bs_health = loadbalancer_client.get_backend_set_health(lb.id, bs_name).data
+        except Exception:
+            for name in names:
+                health[(bs_name, name)] = "UNKNOWN"
+            continue
+
+        status_by_name = {}
+        for name in bs_health.unknown_state_backend_names or []:
+            status_by_name[name] = "UNKNOWN"
+        for name in bs_health.warning_state_backend_names or []:
+            status_by_name[name] = "WARNING"
+        for name in bs_health.critical_state_backend_names or []:
+            status_by_name[name] = "CRITICAL"
+        for name in names:
+            health[(bs_name, name)] = status_by_name.get(name, "OK")
+
+    return health
+
+
+# -----------------------------------------------------------------------------
+# 리소스 관계 그래프
+# -----------------------------------------------------------------------------
+# 컴파트먼트 단위 목록 API 만으로 인스턴스/VNIC/서브넷/NSG/볼륨/LB 노드와 관계(edge)를
+# 한 번 구성하고, 모든 섹션과 질의(--attached-to, --orphans)가 이 그래프를 읽는다.
+# 노드는 __slots__ 레코드, OCID/상태/종류 문자열은 sys.intern 으로 공유해 10만 노드
+# 이상에서도 메모리를 작게 유지한다.
+
+_intern = sys.intern
+
+KIND_INSTANCE = "instance"
+KIND_VNIC = "vnic"
+KIND_SUBNET = "subnet"
+KIND_NSG = "nsg"
+KIND_VOLUME = "volume"
+KIND_BOOT_VOLUME = "boot_volume"
+KIND_LOAD_BALANCER = "load_balancer"
+
+# edge 종류 (방향: 앞 -> 뒤)
+EDGE_VNIC = "vnic"                  # instance -> vnic
+EDGE_SUBNET = "subnet"              # vnic / load_balancer -> subnet
+EDGE_NSG = "nsg"                    # vnic / load_balancer -> nsg
+EDGE_SECURITY_LIST = "security_list"  # subnet -> security list
+EDGE_BOOT_VOLUME = "boot_volume"    # instance -> boot_volume
+EDGE_VOLUME = "volume"              # instance -> volume
+EDGE_BACKEND = "backend"            # load_balancer -> instance
+
+
+def _i(value):
+    """None 이 아닌 문자열만 intern"""
+    return _intern(value) if value else value
+
+
+class GraphNode:
+    __slots__ = ("id", "kind", "name", "compartment_id", "state", "tags")
+
+    def __init__(self, kind, resource, name=None, tags=None):
+        self.id = _i(resource.id)
+        self.kind = kind
+        self.name = name if name is not None else resource.display_name
+        self.compartment_id = _i(resource.compartment_id)
+        self.state = _i(getattr(resource, "lifecycle_state", None))
+        self.tags = tags
+
+
+class InstanceNode(GraphNode):
+    __slots__ = ("shape", "ad", "vcpus", "memory_gb")
+
+    def __init__(self, inst, tags=None):
+        super().__init__(KIND_INSTANCE, inst, tags=tags)
+        self.shape = _i(inst.shape)
+        self.ad = _i(inst.availability_domain)
+        self.vcpus = None
+        self.memory_gb = None
+        if inst.shape_config and inst.shape_config.ocpus is not None:
+            self.vcpus = int(inst.shape_config.ocpus * 2)
+            self.memory_gb = inst.shape_config.memory_in_gbs
+
+
+class VnicNode(GraphNode):
+    __slots__ = ("private_ip", "public_ip", "nic_index")
+
+    def __init__(self, attachment):
+        self.id = _i(attachment.vnic_id)
+        self.kind = KIND_VNIC
+        self.name = attachment.display_name
+        self.compartment_id = _i(attachment.compartment_id)
+        self.state = _i(attachment.lifecycle_state)
+        self.tags = None
+        self.private_ip = None
+        self.public_ip = None
+        self.nic_index = attachment.nic_index or 0
+
+
+class SubnetNode(GraphNode):
+    __slots__ = ("cidr", "vcn_id")
+
+    def __init__(self, subnet, tags=None):
+        super().__init__(KIND_SUBNET, subnet, tags=tags)
+        self.cidr = subnet.cidr_block
+        self.vcn_id = _i(subnet.vcn_id)
+
+
+class VolumeNode(GraphNode):
+    __slots__ = ("size_gb", "ad")
+
+    def __init__(self, kind, volume, tags=None):
+        super().__init__(kind, volume, tags=tags)
+        self.size_gb = volume.size_in_gbs
+        self.ad = _i(volume.availability_domain)
+
+
+class LoadBalancerNode(GraphNode):
+    __slots__ = ("shape", "ip_addresses", "is_private", "backend_sets")
+
+    def __init__(self, lb, tags=None):
+        super().__init__(KIND_LOAD_BALANCER, lb, tags=tags)
+        self.shape = _i(lb.shape_name)
+        self.ip_addresses = tuple(ip.ip_address for ip in (lb.ip_addresses or []))
+        self.is_private = bool(getattr(lb, "is_private", False))
+        # ((backend set 이름, ((backend 이름, IP, target), ...)), ...)
+        self.backend_sets = tuple(
+            (bs_name, tuple(
+                (b.name, b.ip_address, getattr(b, "target_id", None) or b.ip_address)
+                for b in (bset.backends or [])
+            ))
+            for bs_name, bset in (lb.backend_sets or {}).items()
+        )
+
+
+class ResourceGraph:
+    """OCID 로 색인된 노드와 양방향 edge 목록"""
+
+    def __init__(self):
+        self.nodes = {}        # OCID -> GraphNode
+        self.by_ip = {}        # (VCN OCID, private IP) -> VNIC OCID (VCN 끼리는 CIDR 이 겹칠 수 있음)
+        self._out = {}         # OCID -> [(edge 종류, OCID), ...]
+        self._in = {}
+        self._fetchers = {}    # OCID 접두사 -> get_* (그래프 밖 리소스 조회용)
+        self._fetched = {}     # OCID -> get_* 응답 (실패하면 None)
+        self._deadline = None  # 마감이 지나면 get_* 조회 없이 OCID 그대로
+
+    def add_node(self, node):
+        self.nodes[node.id] = node
+        return node
+
+    def add_edge(self, src, edge, dst):
+        if not src or not dst:
+            return
+        src = _intern(src)
+        dst = _intern(dst)
+        self._out.setdefault(src, []).append((edge, dst))
+        self._in.setdefault(dst, []).append((edge, src))
+
+    def out(self, node_id, edge=None):
+        return [dst for e, dst in self._out.get(node_id, ()) if edge is None or e == edge]
+
+    def incoming(self, node_id, edge=None):
+        return [src for e, src in self._in.get(node_id, ()) if edge is None or e == edge]
+
+    def of_kind(self, *kinds):
+        return [n for n in self.nodes.values() if n.kind in kinds]
+
+    def fetch(self, ocid):
+        """그래프 밖 리소스를 get_* 으로 1회 조회 후 캐시 (실패 / 마감 후 / 모르는 종류는 None)"""
+        if ocid in self._fetched:
+            return self._fetched[ocid]
+        if self._deadline is not None and self._deadline.expired():
+            return None
+        resource = None
+        for prefix, fetch in self._fetchers.items():
+            if ocid and ocid.startswith(prefix):
+                try:
+                    resource = fetch(ocid).data
+                except Exception:
+                    pass
+                break
+        self._fetched[ocid] = resource
+        return resource
+
+    def name_of(self, ocid):
+        """노드 이름. 그래프 밖 리소스는 get_* 으로 조회, 실패 / 마감 후에는 OCID 그대로"""
+        node = self.nodes.get(ocid)
+        if node is not None:
+            return node.name or node.id
+        resource = self.fetch(ocid)
+        return resource.display_name if resource is not None else ocid
+
+    def volume_size(self, volume_id):
+        """(부팅) 볼륨 크기(GB). 그래프 밖(-c 밖 컴파트먼트) 볼륨은 get_* 으로 조회, 모르면 None"""
+        node = self.nodes.get(volume_id)
+        if node is not None:
+            return node.size_gb
+        volume = self.fetch(volume_id)
+        return volume.size_in_gbs if volume is not None else None
+
+    # ---- 관계 질의 ----------------------------------------------------------
+    def primary_vnic(self, instance_id):
+        vnics = [self.nodes[v] for v in self.out(instance_id, EDGE_VNIC) if v in self.nodes]
+        return min(vnics, key=lambda v: v.nic_index) if vnics else None
+
+    def vcns_of(self, node_id):
+        """노드(LB / VNIC)가 속한 서브넷들의 VCN OCID 집합 (그래프에 없는 서브넷은 제외)"""
+        subnets = (self.nodes.get(s) for s in self.out(node_id, EDGE_SUBNET))
+        return {s.vcn_id for s in subnets if s is not None and s.kind == KIND_SUBNET and s.vcn_id}
+
+    def instance_of_ip(self, ip_address, vcn_ids):
+        """vcn_ids 안에서 ip_address 를 가진 인스턴스 (VCN 을 모르거나 여러 인스턴스가 해당되면 None)"""
+        owners = set()
+        for vcn_id in vcn_ids:
+            vnic_id = self.by_ip.get((vcn_id, ip_address))
+            if vnic_id:
+                owners.update(self.incoming(vnic_id, EDGE_VNIC))
+        return owners.pop() if len(owners) == 1 else None
+
+    def resolve_target(self, target, vcn_ids=()):
+        """LB backend 대상(OCID 또는 vcn_ids 안의 IP) -> '인스턴스 이름' / '인스턴스 이름 (IP)', 모르면 그대로"""
+        node = self.nodes.get(target)
+        if node is not None:
+            return node.name
+        instance_id = self.instance_of_ip(target, vcn_ids)
+        if instance_id:
+            return f"{self.name_of(instance_id)} ({target})"
+        return target
+
+    def instances_in_subnet(self, subnet_id):
+        result = set()
+        for vnic_id in self.incoming(subnet_id, EDGE_SUBNET):
+            result.update(self.incoming(vnic_id, EDGE_VNIC))
+        return result
+
+    def instances_in_nsg(self, nsg_id):
+        result = set()
+        for vnic_id in self.incoming(nsg_id, EDGE_NSG):
+            result.update(self.incoming(vnic_id, EDGE_VNIC))
+        return result
+
+    def attached_to_subnet(self, subnet_id):
+        """서브넷에 붙은 모든 것: VNIC, 그 인스턴스와 볼륨, VNIC 의 NSG, 서브넷의 LB"""
+        result = set()
+        for src in self.incoming(subnet_id, EDGE_SUBNET):
+            result.add(src)
+            for inst_id in self.incoming(src, EDGE_VNIC):
+                result.add(inst_id)
+                result.update(self.out(inst_id, EDGE_BOOT_VOLUME))
+                result.update(self.out(inst_id, EDGE_VOLUME))
+            result.update(self.out(src, EDGE_NSG))
+        return result
+
+    def orphaned_volumes(self):
+        """어떤 인스턴스에도 붙어 있지 않은 (부팅) 볼륨"""
+        return [
+            n for n in self.of_kind(KIND_VOLUME, KIND_BOOT_VOLUME)
+            if n.state not in ("TERMINATED", "TERMINATING") and not self._in.get(n.id)
+        ]
+
+    def unused_nsgs(self):
+        """VNIC 도 LB 도 사용하지 않는 NSG"""
+        return [n for n in self.of_kind(KIND_NSG) if not self.incoming(n.id, EDGE_NSG)]
+
+
+def _node_fields(graph, node, comp_fields_map):
+    """--filter 평가용 필드 (관계가 모두 그래프에 있으므로 항상 최종 평가 가능)"""
+    fields = dict(
+        comp_fields_map.get(node.compartment_id, {}),
+        name=node.name,
+        state=node.state,
+        tags=node.tags or {},
+    )
+    if node.kind == KIND_INSTANCE:
+        fields.update(shape=node.shape, ad=node.ad)
+        if node.vcpus is not None:
+            fields.update(vcpus=node.vcpus, memory=node.memory_gb)
+        ips = []
+        for vnic_id in graph.out(node.id, EDGE_VNIC):
+            vnic = graph.nodes.get(vnic_id)
+            if vnic is not None:
+                ips.extend(ip for ip in (vnic.private_ip, vnic.public_ip) if ip)
+        fields["ip"] = ips
+    elif node.kind == KIND_LOAD_BALANCER:
+        fields.update(shape=node.shape, ip=list(node.ip_addresses))
+    elif node.kind in (KIND_VOLUME, KIND_BOOT_VOLUME):
+        fields.update(size=node.size_gb, ad=node.ad)
+    return fields
+
+
+def _list_unit(list_fn, deadline=None, **kwargs):
+    """journal 단위 목록 조회: 실패하면 IncompleteUnit([]) (빈 목록으로 진행하되 완료로 기록하지 않음)
+
+    페이지 사이에서 마감이면 지금까지의 항목을 담은 DeadlineExceeded 를 그대로 올린다.
+    """
+    try:
+        return _list_pages(list_fn, deadline, **kwargs)
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        raise IncompleteUnit([])
+
+
+def _load_graph_part(part, comp_id, clients, ad_names, list_kwargs, deadline=None):
+    """컴파트먼트 1개에 대한 part(compute/attachments/network/storage/lb) 목록 조회 (스레드에서 실행)"""
+    compute_client, virtual_network_client, block_storage_client, loadbalancer_client = clients
+    data = {}
+    failed = []
+    expired = []
+
+    def list_all(list_fn, **kwargs):
+        try:
+            return _list_unit(list_fn, deadline, **kwargs)
+        except IncompleteUnit as e:
+            failed.append(list_fn)
+            return e.data
+        except DeadlineExceeded as e:
+            expired.append(list_fn)
+            return e.partial
+
+    if part == "compute":
+        data["instances"] = list_all(
+            compute_client.list_instances, compartment_id=comp_id, **list_kwargs.get(KIND_INSTANCE, {})
+        )
+        data["vnic_attachments"] = list_all(compute_client.list_vnic_attachments, compartment_id=comp_id)
+    elif part == "attachments":
+        data["volume_attachments"] = list_all(compute_client.list_volume_attachments, compartment_id=comp_id)
+        data["boot_attachments"] = []
+        for ad in ad_names:
+            data["boot_attachments"].extend(list_all(
+                compute_client.list_boot_volume_attachments, availability_domain=ad, compartment_id=comp_id
+            ))
+    elif part == "network":
+        data["subnets"] = list_all(virtual_network_client.list_subnets, compartment_id=comp_id)
+        data["private_ips"] = []
+        for subnet in data["subnets"]:
+            data["private_ips"].extend(list_all(virtual_network_client.list_private_ips, subnet_id=subnet.id))
+        data["public_ips"] = list_all(virtual_network_client.list_public_ips, scope="REGION", compartment_id=comp_id)
+        for ad in ad_names:
+            data["public_ips"].extend(list_all(
+                virtual_network_client.list_public_ips,
+                scope="AVAILABILITY_DOMAIN", availability_domain=ad, compartment_id=comp_id
+            ))
+        data["nsgs"] = list_all(virtual_network_client.list_network_security_groups, compartment_id=comp_id)
+        data["nsg_vnics"] = {
+            nsg.id: list_all(virtual_network_client.list_network_security_group_vnics,
+                                   network_security_group_id=nsg.id)
+            for nsg in data["nsgs"]
+        }
+    elif part == "storage":
+        data["volumes"] = list_all(
+            block_storage_client.list_volumes, compartment_id=comp_id, **list_kwargs.get(KIND_VOLUME, {})
+        )
+        data["boot_volumes"] = []
+        for ad in ad_names:
+            data["boot_volumes"].extend(list_all(
+                block_storage_client.list_boot_volumes, availability_domain=ad, compartment_id=comp_id
+            ))
+    elif part == "lb":
+        data["load_balancers"] = list_all(
+            loadbalancer_client.list_load_balancers, compartment_id=comp_id, **list_kwargs.get(KIND_LOAD_BALANCER, {})
+        )
+    if expired:
+        # 마감: 읽은 만큼만 쓰고 journal 에는 완료로 남기지 않음 (_gather 가 컴파트먼트를 미완료로 표시)
+        raise DeadlineExceeded((part, data))
+    if failed:
+        # 실패한 목록은 빈 목록으로 두고, --resume 때 이 단위를 다시 조회
+        raise IncompleteUnit((part, data))
+    return part, data
+
+
+def _load_subnet(virtual_network_client, subnet_id, with_ips, deadline=None):
+    """서브넷 1개 get (+ with_ips 면 소속 private IP 목록) -> {"subnets": [...], "private_ips": [...]} (스레드에서 실행)"""
+    data = {"subnets": [], "private_ips": []}
+    complete = True
+    try:
+        data["subnets"].append(virtual_network_client.get_subnet(subnet_id).data)
+    except Exception:
+        complete = False
+    if with_ips:
+        try:
+            data["private_ips"] = _list_unit(virtual_network_client.list_private_ips, deadline, subnet_id=subnet_id)
+        except IncompleteUnit:
+            complete = False
+        except DeadlineExceeded as e:
+            data["private_ips"] = e.partial
+            raise DeadlineExceeded(data)
+    if not complete:
+        raise IncompleteUnit(data)
+    return data
+
+
+def build_resource_graph(compute_client, virtual_network_client, block_storage_client, loadbalancer_client,
+                         scopes, ad_names, workers, list_kwargs=None, keep_tags=False, journal=_NULL_JOURNAL,
+                         deadline=None, vnic_ips=False):
+    """scopes: {part: [compartment, ...]} 에 대해 목록 API 를 병렬 호출해 ResourceGraph 구성
+
+    part: "compute"(인스턴스, VNIC attachment), "attachments"(볼륨/부팅 볼륨 attachment),
+    "network"(서브넷, private/public IP, NSG 와 소속 VNIC), "storage"(블록/부팅 볼륨), "lb"(로드 밸런서, backend 포함)
+    vnic_ips: network 없이 compute 의 VNIC 이 속한 서브넷의 private IP 만 추가로 조회
+              (LB backend 를 LB 의 VCN 안에서만 찾도록 VNIC / LB 서브넷은 get 으로 VCN 도 확인)
+    """
+    clients = (compute_client, virtual_network_client, block_storage_client, loadbalancer_client)
+    list_kwargs = list_kwargs or {}
+    tags_of = _tag_fields if keep_tags else (lambda resource: None)
+
+    results = {part: [] for part in ("compute", "attachments", "network", "storage", "lb")}
+    # (part, 컴파트먼트, 내려보낸 조건) 단위로 journal 에 기록 / 복원, 마감 시 끝나지 않은 컴파트먼트는 deadline 에 표시
+    part_kinds = {"compute": KIND_INSTANCE, "storage": KIND_VOLUME, "lb": KIND_LOAD_BALANCER}
+    tasks = [
+        (comp.name, functools.partial(
+            journal.cached, ("graph", part, comp.id, _list_kwargs_key(list_kwargs.get(part_kinds.get(part)))),
+            functools.partial(_load_graph_part, part, comp.id, clients, ad_names, list_kwargs, deadline)
+        ))
+        for part, comps in scopes.items()
+        for comp in comps
+    ]
+    for part, data in _gather(tasks, workers, deadline):
+        results[part].append(data)
+
+    if vnic_ips:
+        # 서브넷 단위 조회 (라벨은 VNIC attachment / LB 의 컴파트먼트), private IP 는 VNIC 서브넷만
+        comp_names = {comp.id: comp.name for comps in scopes.values() for comp in comps}
+        subnets = {}
+        for data in results["compute"]:
+            for att in data["vnic_attachments"]:
+                if att.lifecycle_state == "ATTACHED" and att.subnet_id:
+                    subnets.setdefault(att.subnet_id, comp_names.get(att.compartment_id, att.compartment_id))
+        vnic_subnets = set(subnets)
+        for data in results["lb"]:
+            for lb in data["load_balancers"]:
+                for subnet_id in lb.subnet_ids or []:
+                    subnets.setdefault(subnet_id, comp_names.get(lb.compartment_id, lb.compartment_id))
+        tasks = [
+            (label, functools.partial(
+                journal.cached, ("graph", "subnet", subnet_id, subnet_id in vnic_subnets),
+                functools.partial(_load_subnet, virtual_network_client, subnet_id, subnet_id in vnic_subnets, deadline)
+            ))
+            for subnet_id, label in subnets.items()
+        ]
+        loaded = _gather(tasks, workers, deadline)
+        results["network"].append({
+            "subnets": [subnet for data in loaded for subnet in data["subnets"]],
+            "private_ips": [pip for data in loaded for pip in data["private_ips"]],
+            "public_ips": [], "nsgs": [], "nsg_vnics": {},
+        })
+
+    graph = ResourceGraph()
+    graph._deadline = deadline
+    graph._fetchers = {
+        "ocid1.instance.": compute_client.get_instance,
+        "ocid1.volume.": block_storage_client.get_volume,
+        "ocid1.bootvolume.": block_storage_client.get_boot_volume,
+        "ocid1.subnet.": virtual_network_client.get_subnet,
+        "ocid1.networksecuritygroup.": virtual_network_client.get_network_security_group,
+    }
+
+    # 1) compute: 인스턴스, VNIC
+    for data in results["compute"]:
+        for inst in data["instances"]:
+            graph.add_node(InstanceNode(inst, tags_of(inst)))
+        for att in data["vnic_attachments"]:
+            if att.lifecycle_state != "ATTACHED" or not att.vnic_id:
+                continue
+            graph.add_node(VnicNode(att))
+            graph.add_edge(att.instance_id, EDGE_VNIC, att.vnic_id)
+            graph.add_edge(att.vnic_id, EDGE_SUBNET, att.subnet_id)
+
+    # 2) network: 서브넷, IP, NSG (IP 색인의 VCN 은 private IP 의 서브넷으로)
+    private_ip_owner = {}
+    for data in results["network"]:
+        for subnet in data["subnets"]:
+            graph.add_node(SubnetNode(subnet, tags_of(subnet)))
+            for sl_id in subnet.security_list_ids or []:
+                graph.add_edge(subnet.id, EDGE_SECURITY_LIST, sl_id)
+    for data in results["network"]:
+        for pip in data["private_ips"]:
+            if not pip.vnic_id:
+                continue
+            subnet = graph.nodes.get(pip.subnet_id)
+            if subnet is not None:
+                graph.by_ip[(subnet.vcn_id, pip.ip_address)] = _intern(pip.vnic_id)
+            private_ip_owner[pip.id] = pip.vnic_id
+            vnic = graph.nodes.get(pip.vnic_id)
+            if vnic is not None and (pip.is_primary or vnic.private_ip is None):
+                vnic.private_ip = pip.ip_address
+        for nsg in data["nsgs"]:
+            graph.add_node(GraphNode(KIND_NSG, nsg, tags=tags_of(nsg)))
+            for member in data["nsg_vnics"].get(nsg.id, []):
+                graph.add_edge(member.vnic_id, EDGE_NSG, nsg.id)
+    for data in results["network"]:
+        for pub in data["public_ips"]:
+            vnic = graph.nodes.get(private_ip_owner.get(pub.private_ip_id or pub.assigned_entity_id))
+            if vnic is not None:
+                vnic.public_ip = pub.ip_address
+
+    # 3) storage: 볼륨
+    for data in results["storage"]:
+        for vol in data["volumes"]:
+            graph.add_node(VolumeNode(KIND_VOLUME, vol, tags_of(vol)))
+        for bv in data["boot_volumes"]:
+            graph.add_node(VolumeNode(KIND_BOOT_VOLUME, bv, tags_of(bv)))
+
+    # 4) 볼륨 attachment edge (볼륨 노드가 그래프 밖이어도 edge 는 유지)
+    for data in results["attachments"]:
+        for att in data["boot_attachments"]:
+            if att.lifecycle_state == "ATTACHED":
+                graph.add_edge(att.instance_id, EDGE_BOOT_VOLUME, att.boot_volume_id)
+        for att in data["volume_attachments"]:
+            if att.lifecycle_state == "ATTACHED":
+                graph.add_edge(att.instance_id, EDGE_VOLUME, att.volume_id)
+
+    # 5) LB: backend 는 LB 서브넷의 VCN 안에서 IP 역색인으로 인스턴스에 연결 (VCN 을 모르면 연결하지 않음)
+    for data in results["lb"]:
+        for lb in data["load_balancers"]:
+            node = graph.add_node(LoadBalancerNode(lb, tags_of(lb)))
+            for subnet_id in lb.subnet_ids or []:
+                graph.add_edge(node.id, EDGE_SUBNET, subnet_id)
+            for nsg_id in lb.network_security_group_ids or []:
+                graph.add_edge(node.id, EDGE_NSG, nsg_id)
+            vcn_ids = graph.vcns_of(node.id)
+            for _, backends in node.backend_sets:
+                for _, ip_address, target in backends:
+                    instance_id = target if target in graph.nodes else graph.instance_of_ip(ip_address, vcn_ids)
+                    if instance_id:
+                        graph.add_edge(node.id, EDGE_BACKEND, instance_id)
+
+    return graph
+
+
+# -----------------------------------------------------------------------------
+# 보안 룰 인덱스 (NSG / Security List) 및 노출 분석
+# -----------------------------------------------------------------------------
+_PROTOCOL_NAMES = {"1": "ICMP", "6": "TCP", "17": "UDP", "58": "ICMPv6", "all": "ALL"}
+_PROTOCOL_NUMBERS = {name.lower(): num for num, name in _PROTOCOL_NAMES.items()}
+
+
+def _protocol_name(proto):
+    return _PROTOCOL_NAMES.get(proto, proto)
+
+
+def _rule_peer(rule, direction):
+    """INGRESS 룰은 source, EGRESS 룰은 destination"""
+    return rule.source if direction == "INGRESS" else rule.destination
+
+
+def _rule_port_bounds(rule):
+    """룰이 허용하는 (최소, 최대) 목적지 포트. ICMP는 type 범위, 포트 개념이 없는 프로토콜은 None"""
+    proto = rule.protocol
+    if proto in ("1", "58"):
+        icmp = rule.icmp_options
+        if icmp and icmp.type is not None:
+            return (icmp.type, icmp.type)
+        return (0, 255)
+    if proto == "6":
+        opts = rule.tcp_options
+    elif proto == "17":
+        opts = rule.udp_options
+    else:
+        return None
+    rng = opts.destination_port_range if opts else None
+    return (rng.min, rng.max) if rng else (1, 65535)
+
+
+def _format_rule_ports(rule):
+    """테이블 표시용 포트 범위 (ICMP는 type/code)"""
+    if rule.protocol in ("1", "58"):
+        icmp = rule.icmp_options
+        if icmp and icmp.type is not None:
+            return f"type {icmp.type}" + (f" code {icmp.code}" if icmp.code is not None else "")
+        return "-"
+    if rule.tcp_options and rule.tcp_options.destination_port_range:
+        rng = rule.tcp_options.destination_port_range
+        return f"{rng.min}-{rng.max}"
+    if rule.udp_options and rule.udp_options.destination_port_range:
+        rng = rule.udp_options.destination_port_range
+        return f"{rng.min}-{rng.max}"
+    return "-"
+
+
+class SecurityRuleRecord:
+    """인덱싱용 보안 룰 1건 (NSG 룰 또는 Security List 룰)"""
+
+    __slots__ = ("owner_type", "owner_id", "owner_name", "compartment_name", "direction",
+                 "protocol", "ports", "peer", "cidr", "description", "port_str")
+
+    def __init__(self, owner_type, owner_id, owner_name, compartment_name, direction, rule):
+        self.owner_type = owner_type          # "NSG" / "SecList"
+        self.owner_id = owner_id
+        self.owner_name = owner_name
+        self.compartment_name = compartment_name
+        self.direction = direction            # "INGRESS" / "EGRESS"
+        self.protocol = rule.protocol         # "6", "17", "1", "all" ...
+        self.ports = _rule_port_bounds(rule)
+        self.peer = _rule_peer(rule, direction)
+        # NSG OCID / 서비스 CIDR 라벨 등 CIDR 이 아닌 peer 는 None
+        self.cidr = _as_network(self.peer) if self.peer and "/" in self.peer else None
+        self.description = rule.description
+        self.port_str = _format_rule_ports(rule)
+
+
+class _IntervalTree:
+    """정적 centered interval tree: 점을 포함하는 구간의 값을 O(log n + k)로 조회
+
+    포트/ICMP type 은 0~65535 정수이므로 중심값을 값 범위의 중간으로 잡아 깊이를 17 이하로 고정한다.
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals, low=0, high=65535):
+        # intervals: [(lo, hi, value), ...] (비어 있지 않음)
+        self.center = (low + high) // 2
+        here, left, right = [], [], []
+        for iv in intervals:
+            if iv[1] < self.center:
+                left.append(iv)
+            elif iv[0] > self.center:
+                right.append(iv)
+            else:
+                here.append(iv)
+        self.by_start = sorted(here, key=lambda iv: iv[0])
+        self.by_end = sorted(here, key=lambda iv: -iv[1])
+        self.left = _IntervalTree(left, low, self.center - 1) if left else None
+        self.right = _IntervalTree(right, self.center + 1, high) if right else None
+
+    def stab(self, point, out):
+        node = self
+        while node is not None:
+            if point < node.center:
+                for lo, _, value in node.by_start:
+                    if lo > point:
+                        break
+                    out.add(value)
+                node = node.left
+            elif point > node.center:
+                for _, hi, value in node.by_end:
+                    if hi < point:
+                        break
+                    out.add(value)
+                node = node.right
+            else:
+                out.update(value for _, _, value in node.by_start)
+                break
+        return out
+
+
+class _CidrTrie:
+    """접두사 트라이: 질의 CIDR 을 포함하는 CIDR 의 값을 조회
+
+    비트 단위 노드 대신 접두사 길이별 해시 테이블(레벨 압축)로 구성해, 삽입은 O(1),
+    조회는 실제로 존재하는 접두사 길이 수만큼의 해시 조회로 끝난다.
+    """
+
+    __slots__ = ("bits", "levels")
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.levels = {}     # prefixlen -> {네트워크 주소(int): [값, ...]}
+
+    def insert(self, network, value):
+        level = self.levels.setdefault(network.prefixlen, {})
+        level.setdefault(int(network.network_address), []).append(value)
+
+    def containing(self, network, out):
+        addr = int(network.network_address)
+        for prefixlen, level in self.levels.items():
+            if prefixlen > network.prefixlen:
+                continue
+            mask = ((1 << prefixlen) - 1) << (self.bits - prefixlen)
+            hit = level.get(addr & mask)
+            if hit:
+                out.update(hit)
+        return out
+
+
+class RuleIndex:
+    """(방향, 프로토콜) 별 포트 interval tree + CIDR 트라이로 구성한 보안 룰 인덱스"""
+
+    def __init__(self, records):
+        self.records = records
+        grouped = {}
+        for i, rec in enumerate(records):
+            grouped.setdefault((rec.direction, rec.protocol), []).append(i)
+
+        self._buckets = {}
+        for key, ids in grouped.items():
+            intervals = [(records[i].ports or (0, 65535)) + (i,) for i in ids]
+            tries = {4: _CidrTrie(32), 6: _CidrTrie(128)}
+            for i in ids:
+                cidr = records[i].cidr
+                if cidr is not None:
+                    tries[cidr.version].insert(cidr, i)
+            self._buckets[key] = (_IntervalTree(intervals), tries, ids)
+
+    def query(self, direction, protocol, port, cidr):
+        """cidr 의 모든 주소에서 protocol/port 로 오는(가는) 트래픽을 허용하는 룰 목록
+
+        port 가 None 이면 포트와 무관하게 해당 프로토콜을 허용하는 룰을 모두 찾는다.
+        protocol "all" 룰은 모든 프로토콜 질의에 매칭된다.
+        """
+        protocols = ("all",) if protocol == "all" else (protocol, "all")
+        hits = set()
+        for proto in protocols:
+            bucket = self._buckets.get((direction, proto))
+            if bucket is None:
+                continue
+            tree, tries, ids = bucket
+            by_cidr = tries[cidr.version].containing(cidr, set())
+            if port is None or proto == "all":
+                hits.update(by_cidr)
+            else:
+                hits.update(by_cidr & tree.stab(port, set()))
+        return [self.records[i] for i in sorted(hits)]
+
+
+def parse_exposed_spec(spec):
+    """'22/tcp', '443', '53/udp', 'icmp', '8/icmp', 'all' -> (프로토콜 번호, 포트 또는 None)"""
+    text = spec.strip().lower()
+    port_str, _, proto_str = text.rpartition("/")
+    if not port_str and proto_str.isdigit():
+        port_str, proto_str = proto_str, "tcp"
+    if proto_str not in _PROTOCOL_NUMBERS:
+        raise argparse.ArgumentTypeError(f"알 수 없는 프로토콜: {spec!r} (tcp/udp/icmp/icmpv6/all)")
+    if not port_str:
+        return _PROTOCOL_NUMBERS[proto_str], None
+    if not port_str.isdigit() or proto_str == "all":
+        raise argparse.ArgumentTypeError(f"포트 형식이 잘못되었습니다: {spec!r} (예: 22/tcp)")
+    return _PROTOCOL_NUMBERS[proto_str], int(port_str)
+
+
+def parse_cidr_arg(value):
+    net = _as_network(value)
+    if net is None:
+        raise argparse.ArgumentTypeError(f"CIDR 형식이 아닙니다: {value!r}")
+    return net
+
+
+def _list_compartment_rules(virtual_network_client, comp, name_filter, journal=_NULL_JOURNAL, resource_filter=None,
+                            comp_fields=None, deadline=None):
+    """컴파트먼트 1개의 NSG 룰 / Security List 룰 조회
+
+    resource_filter 가 있으면 --nsg 와 같이 소유자 단위 조건은 룰 조회 전에, ip(=룰 peer) 조건은 룰마다 평가한다.
+    페이지 사이에서 마감이면 지금까지의 룰을 담아 DeadlineExceeded.
+    """
+    records = []
+    expired = []
+
+    def list_all(list_fn, **kwargs):
+        try:
+            return _list_pages(list_fn, deadline, **kwargs)
+        except DeadlineExceeded as e:
+            # journal 에 완료로 남기지 않도록 IncompleteUnit 으로 넘기고, 끝에서 DeadlineExceeded
+            expired.append(list_fn)
+            raise IncompleteUnit(e.partial)
+
+    def owner_fields(owner):
+        if resource_filter is None:
+            return None
+        fields = dict(comp_fields or {}, name=owner.display_name, state=owner.lifecycle_state, tags=_tag_fields(owner))
+        return None if resource_filter.evaluate(fields) is False else fields
+
+    def add(owner_type, owner, fields, direction, rule):
+        rec = SecurityRuleRecord(owner_type, owner.id, owner.display_name, comp.name, direction, rule)
+        if fields is None or resource_filter.evaluate(dict(fields, ip=rec.peer), final=True):
+            records.append(rec)
+
+    try:
+        nsgs = journal.cached(("all_nsgs", comp.id), lambda: list_all(
+            virtual_network_client.list_network_security_groups, compartment_id=comp.id
+        ))
+    except Exception:
+        nsgs = []
+    for nsg in nsgs:
+        if name_filter and name_filter not in nsg.display_name.lower():
+            continue
+        fields = owner_fields(nsg)
+        if resource_filter is not None and fields is None:
+            continue
+        try:
+            rules = journal.cached(("nsg_rules", nsg.id), lambda: list_all(
+                virtual_network_client.list_network_security_group_security_rules,
+                network_security_group_id=nsg.id
+            ))
+        except Exception:
+            continue
+        for rule in rules:
+            add("NSG", nsg, fields, rule.direction, rule)
+
+    # Security List 는 룰이 목록 응답에 포함되어 있어 추가 호출 없음
+    try:
+        seclists = journal.cached(("seclists", comp.id), lambda: list_all(
+            virtual_network_client.list_security_lists, compartment_id=comp.id
+        ))
+    except Exception:
+        seclists = []
+    for sl in seclists:
+        if name_filter and name_filter not in sl.display_name.lower():
+            continue
+        fields = owner_fields(sl)
+        if resource_filter is not None and fields is None:
+            continue
+        for rule in sl.ingress_security_rules or []:
+            add("SecList", sl, fields, "INGRESS", rule)
+        for rule in sl.egress_security_rules or []:
+            add("SecList", sl, fields, "EGRESS", rule)
+    if expired:
+        raise DeadlineExceeded(records)
+    return records
+
+
+def collect_security_rules(virtual_network_client, compartments, workers, name_filter=None, journal=_NULL_JOURNAL,
+                           deadline=None, resource_filter=None, comp_fields_map=None):
+    """전체 컴파트먼트의 NSG / Security List 룰을 병렬 조회 -> SecurityRuleRecord 목록"""
+    records = []
+    comp_fields_map = comp_fields_map or {}
+    tasks = [
+        (comp.name, functools.partial(
+            _list_compartment_rules, virtual_network_client, comp, name_filter, journal,
+            resource_filter, comp_fields_map.get(comp.id), deadline
+        ))
+        for comp in compartments
+    ]
+    for comp_records in _gather(tasks, workers, deadline):
+        records.extend(comp_records)
+    return records
+
+
+# -----------------------------------------------------------------------------
+# 스냅샷 (--snapshot FILE) / diff OLD NEW
+# -----------------------------------------------------------------------------
+# 스냅샷은 gzip 으로 압축한 컬럼 단위 JSON 이다. 섹션마다 OCID(key) 배열, 행 내용 해시 배열,
+# 컬럼별 값 배열을 두고, 반복이 많은 문자열 컬럼은 사전(dictionary) 인코딩한다.
+# diff 는 OLD 의 key -> 행 번호 해시 테이블로 NEW 를 한 번 훑는 해시 조인이라 행 수에 선형이고,
+# 해시가 다른 행만 디코딩해 바뀐 컬럼을 계산한다.
+
+SNAPSHOT_FORMAT = "oci_info-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SECTIONS = ("instances", "load_balancers", "nsg_rules", "volumes", "buckets")
+
+
+def _plain(value):
+    """레코드 값 -> JSON 값 (enum 은 값, 튜플은 리스트, 중첩 레코드는 dict)"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (tuple, list)):
+        return [_plain(v) for v in value]
+    if isinstance(value, _Record):
+        return {k: _plain(v) for k, v in value.as_dict().items()}
+    if isinstance(value, SecurityRuleRecord):
+        return {
+            "direction": value.direction,
+            "protocol": value.protocol,
+            "ports": value.port_str,
+            "peer": value.peer,
+            "description": value.description,
+        }
+    return str(value)
+
+
+def _row_hash(row):
+    encoded = json.dumps(row, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def _encode_column(values):
+    """반복이 많은 문자열 컬럼은 {"dict": [...], "codes": [...]} 로"""
+    if len(values) >= 16 and all(v is None or isinstance(v, str) for v in values):
+        uniques = {}
+        codes = [uniques.setdefault(v, len(uniques)) for v in values]
+        if len(uniques) * 2 <= len(values):
+            return {"dict": list(uniques), "codes": codes}
+    return values
+
+
+def _decode_column(column):
+    if isinstance(column, dict):
+        lookup = column["dict"]
+        return [lookup[c] for c in column["codes"]]
+    return column
+
+
+def write_snapshot(path, sections):
+    """sections: {섹션 이름: 레코드 목록} -> path 에 압축 컬럼 스냅샷 저장, 저장한 행 수 반환"""
+    doc = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "sections": {},
+    }
+    total = 0
+    for section, records in sections.items():
+        records = list(records)
+        columns = [name for name in (type(records[0]).__slots__ if records else ()) if name != "id"]
+        keys = []
+        hashes = []
+        data = {name: [] for name in columns}
+        for rec in records:
+            row = [_plain(getattr(rec, name)) for name in columns]
+            keys.append(rec.id or f"{section}:{rec.compartment_name}/{rec.name}")
+            hashes.append(_row_hash(row))
+            for name, value in zip(columns, row):
+                data[name].append(value)
+        doc["sections"][section] = {
+            "columns": columns,
+            "keys": keys,
+            "hashes": hashes,
+            "data": {name: _encode_column(values) for name, values in data.items()},
+        }
+        total += len(records)
+
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(doc, f, separators=(",", ":"), ensure_ascii=False)
+    return total
+
+
+def load_snapshot(path):
+    """스냅샷 파일 읽기 (형식이 다르면 ValueError)"""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path}: 스냅샷 파일을 읽을 수 없습니다 ({e})")
+    if doc.get("format") != SNAPSHOT_FORMAT or doc.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: 지원하지 않는 스냅샷 형식입니다")
+    return doc
+
+
+class DiffRecord(_Record):
+    # change: "added" / "removed" / "modified", changes: ((컬럼, OLD 값, NEW 값), ...)
+    __slots__ = ("section", "change", "key", "name", "compartment_name", "changes")
+
+
+class _SnapshotSection:
+    """스냅샷 섹션 1개: 컬럼은 필요할 때 한 번만 디코딩"""
+
+    def __init__(self, section):
+        self.columns = section["columns"]
+        self.keys = section["keys"]
+        self.hashes = section["hashes"]
+        self._raw = section["data"]
+        self._decoded = {}
+
+    def column(self, name):
+        if name not in self._decoded:
+            self._decoded[name] = _decode_column(self._raw[name]) if name in self._raw else [None] * len(self.keys)
+        return self._decoded[name]
+
+    def value(self, name, i):
+        return self.column(name)[i]
+
+
+def _changed_columns(old, i, new, j):
+    changes = []
+    for name in new.columns:
+        before = old.value(name, i) if name in old.columns else None
+        after = new.value(name, j)
+        if before != after:
+            changes.append((name, before, after))
+    return tuple(changes)
+
+
+def diff_snapshots(old_doc, new_doc, sections=None):
+    """두 스냅샷의 섹션별 DiffRecord 목록과 변경 없는 행 수 -> {섹션: ([DiffRecord], unchanged)}"""
+    result = {}
+    for name in sections or SNAPSHOT_SECTIONS:
+        # 한쪽에서만 수집한 섹션은 전부 추가/삭제로 보이므로 비교하지 않음
+        if name not in old_doc["sections"] or name not in new_doc["sections"]:
+            continue
+        old = _SnapshotSection(old_doc["sections"][name])
+        new = _SnapshotSection(new_doc["sections"][name])
+
+        # OLD 쪽 key -> 행 번호 (해시 조인의 build 단계)
+        old_index = {key: i for i, key in enumerate(old.keys)}
+        records = []
+        unchanged = 0
+        for j, key in enumerate(new.keys):
+            i = old_index.pop(key, None)
+            if i is None:
+                records.append(DiffRecord(
+                    section=name, change="added", key=key,
+                    name=new.value("name", j), compartment_name=new.value("compartment_name", j), changes=()
+                ))
+            elif old.hashes[i] != new.hashes[j]:
+                records.append(DiffRecord(
+                    section=name, change="modified", key=key,
+                    name=new.value("name", j), compartment_name=new.value("compartment_name", j),
+                    changes=_changed_columns(old, i, new, j)
+                ))
+            else:
+                unchanged += 1
+        # NEW 에서 매칭되지 않고 남은 OLD 행
+        for key, i in old_index.items():
+            records.append(DiffRecord(
+                section=name, change="removed", key=key,
+                name=old.value("name", i), compartment_name=old.value("compartment_name", i), changes=()
+            ))
+        result[name] = (records, unchanged)
+    return result
+
+
+def _format_change(name, before, after):
+    """'state: RUNNING -> STOPPED', 리스트는 추가/삭제된 항목 수"""
+    if isinstance(before, list) or isinstance(after, list):
+        old_items = {json.dumps(v, sort_keys=True) for v in before or []}
+        new_items = {json.dumps(v, sort_keys=True) for v in after or []}
+        added = new_items - old_items
+        removed = old_items - new_items
+        if all(isinstance(v, str) for v in (before or []) + (after or [])):
+            parts = [f"+{json.loads(v)}" for v in sorted(added)] + [f"-{json.loads(v)}" for v in sorted(removed)]
         else:
-            console.print("(No Buckets Matched)")
+            parts = [f"+{len(added)}"] * bool(added) + [f"-{len(removed)}"] * bool(removed)
+        return f"{name}: {' '.join(parts) or '순서 변경'}"
+    return f"{name}: {_text(before)} -> {_text(after)}"
 
 
-    if show_cost:
-        print_cost_table(cost_rows, console, start_date, end_date)
+_DIFF_COLORS = {"added": "green", "removed": "red", "modified": "yellow"}
+_DIFF_MARKS = {"added": "+", "removed": "-", "modified": "~"}
+
+
+def diff_main(argv):
+    parser = argparse.ArgumentParser(prog="oci_info.py diff", description="두 --snapshot 파일 비교")
+    parser.add_argument("old", help="이전 스냅샷 파일")
+    parser.add_argument("new", help="새 스냅샷 파일")
+    parser.add_argument("--section", action="append", choices=SNAPSHOT_SECTIONS,
+                        help="비교할 섹션 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--summary", action="store_true", help="섹션별 건수만 표시")
+    parser.add_argument("--page-size", type=_positive_int, default=None, help="페이지당 행 수")
+    args = parser.parse_args(argv)
+
+    console = Console()
+    started = time.perf_counter()
+    try:
+        old_doc = load_snapshot(args.old)
+        new_doc = load_snapshot(args.new)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        return
+    loaded = time.perf_counter()
+    result = diff_snapshots(old_doc, new_doc, args.section)
+    compared = time.perf_counter()
+    skipped = [
+        name for name in args.section or SNAPSHOT_SECTIONS
+        if (name in old_doc["sections"]) != (name in new_doc["sections"])
+    ]
+
+    summary = Table(show_lines=False, box=box.SIMPLE_HEAVY)
+    summary.add_column("Section", style="bold cyan")
+    summary.add_column("Added", justify="right", style="green")
+    summary.add_column("Removed", justify="right", style="red")
+    summary.add_column("Modified", justify="right", style="yellow")
+    summary.add_column("Unchanged", justify="right")
+    rows = 0
+    for section, (records, unchanged) in result.items():
+        counts = {change: 0 for change in _DIFF_MARKS}
+        for rec in records:
+            counts[rec.change] += 1
+        summary.add_row(section, str(counts["added"]), str(counts["removed"]), str(counts["modified"]), str(unchanged))
+        rows += len(records) + unchanged
+
+    console.print(
+        f"[bold underline]Snapshot Diff: {args.old} ({old_doc['created_at']}) -> "
+        f"{args.new} ({new_doc['created_at']})[/bold underline]"
+    )
+    console.print(
+        f"[dim]{rows} rows, load {loaded - started:.2f}s, compare {compared - loaded:.2f}s[/dim]"
+    )
+    console.print(summary)
+    if skipped:
+        console.print(f"[yellow]한쪽 스냅샷에만 있는 섹션은 비교하지 않았습니다: {', '.join(skipped)}[/yellow]")
+    if args.summary:
+        return
 
+    view = TableView(page_size=args.page_size)
+    columns = [
+        ("", {"justify": "center"}),
+        ("Compartment", {"style": "bold magenta"}),
+        ("Name", {"style": "bold cyan"}),
+        ("Changes", {}),
+    ]
+    # 컬럼 폭을 앞쪽 행으로 정하므로 Changes 가 있는 modified 를 먼저
+    change_order = {"modified": 0, "added": 1, "removed": 2}
+    for section, (records, _) in result.items():
+        if not records:
+            continue
+        console.print(f"\n[bold underline]{section}[/bold underline]")
+        ordered = view.order(records, lambda r: (
+            change_order[r.change], (r.compartment_name or "").lower(), (r.name or "").lower()
+        ))
+        view.print_table(console, columns, (
+            (None, (
+                f"[{_DIFF_COLORS[rec.change]}]{_DIFF_MARKS[rec.change]}[/{_DIFF_COLORS[rec.change]}]",
+                _text(rec.compartment_name),
+                _text(rec.name),
+                "\n".join(_format_change(*c) for c in rec.changes) or "-"
+            ))
+            for rec in ordered
+        ))
 
 
 def get_date_range(cost_start_str, cost_end_str):
@@ -968,6 +3467,510 @@ def print_cost_table(cost_rows, console, start_time, end_time):
     console.print(cost_table)
 
 
+# -----------------------------------------------------------------------------
+# 리소스별 비용 (--cost-by-resource)
+# -----------------------------------------------------------------------------
+# Usage API 를 resourceId 로 그룹핑해 (기간 합산) 끝까지 페이지네이션하며 OCID -> 비용 해시 인덱스로 합산하고,
+# 수집한 레코드의 id 로 바로 조회(조인)한다. 라인 아이템이 수십만 건이어도 한 번 훑는 비용뿐이다.
+
+class ResourceCosts:
+    """resourceId(OCID) -> 비용 인덱스"""
+
+    def __init__(self):
+        self.amounts = {}           # OCID -> 합계
+        self.compartments = {}      # OCID -> compartment_id
+        self._services = {}         # OCID -> {서비스: 금액}
+        self.currency = None
+        self.line_items = 0
+        self.unattributed = 0.0     # resourceId 가 없는 라인 아이템 합계
+
+    def add(self, item):
+        """UsageSummary 1건 합산"""
+        self.line_items += 1
+        amount = float(item.computed_amount) if item.computed_amount else 0.0
+        if self.currency is None and item.currency:
+            self.currency = item.currency
+        if not item.resource_id:
+            self.unattributed += amount
+            return
+        key = item.resource_id.lower()
+        self.amounts[key] = self.amounts.get(key, 0.0) + amount
+        if item.compartment_id:
+            self.compartments[key] = item.compartment_id
+        services = self._services.setdefault(key, {})
+        service = item.service or "(UnknownService)"
+        services[service] = services.get(service, 0.0) + amount
+
+    def get(self, resource_id):
+        """레코드 id -> 비용 (사용 내역이 없으면 None)"""
+        if not resource_id:
+            return None
+        return self.amounts.get(resource_id.lower())
+
+    def service(self, resource_id):
+        """비용이 가장 큰 서비스 이름"""
+        services = self._services.get(resource_id.lower())
+        return max(services, key=services.get) if services else None
+
+    def top(self, n, include=None):
+        """비용 상위 n개 (OCID, 비용), include(OCID) 가 False 인 리소스는 제외"""
+        items = self.amounts.items()
+        if include is not None:
+            items = ((rid, amount) for rid, amount in items if include(rid))
+        return heapq.nlargest(n, items, key=lambda item: item[1])
+
+
+def get_resource_costs(usage_client, tenancy_ocid, start_time, end_time, console=None, deadline=None):
+    """Usage API 를 resourceId/service/compartmentId 로 그룹핑해 조회 -> ResourceCosts (실패 시 None)
+
+    deadline 이 지나면 그때까지 읽은 라인 아이템만 합산해 돌려준다 (deadline 에 "Usage API" 로 표시).
+    """
+    from oci.usage_api.models import RequestSummarizedUsagesDetails
+    details = RequestSummarizedUsagesDetails(
+        tenant_id=tenancy_ocid,
+        time_usage_started=start_time,
+        time_usage_ended=end_time,
+        granularity="DAILY",
+        is_aggregate_by_time=True,      # 기간 전체를 리소스당 한 줄로
+        group_by=["resourceId", "service", "compartmentId"],
+        query_type="COST",
+        compartment_depth=6
+    )
+
+    costs = ResourceCosts()
+    try:
+        # 페이지를 모아 두지 않고 페이지 단위로 바로 합산
+        for response in _iter_pages(usage_client.request_summarized_usages, deadline,
+                                    request_summarized_usages_details=details):
+            for item in response.data.items:
+                costs.add(item)
+    except DeadlineExceeded:
+        deadline.mark("Usage API")
+    except Exception as e:
+        if console is not None:
+            console.print(f"[yellow][WARN][/yellow] Usage API(리소스별) 호출 실패: {e}")
+        return None
+    return costs
+
+
+_RECORD_KINDS = {
+    InstanceRecord: "Instance",
+    LoadBalancerRecord: "Load Balancer",
+    BucketRecord: "Bucket",
+}
+
+
+def _inventory_index(*record_lists):
+    """수집한 레코드 -> {OCID(소문자): (종류, 레코드)} (top-N 표시용)"""
+    index = {}
+    for records in record_lists:
+        for rec in records:
+            if not getattr(rec, "id", None):
+                continue
+            if isinstance(rec, VolumeRecord):
+                kind = "Boot Volume" if rec.kind == KIND_BOOT_VOLUME else "Block Volume"
+            else:
+                kind = _RECORD_KINDS.get(type(rec), type(rec).__name__)
+            index[rec.id.lower()] = (kind, rec)
+    return index
+
+
+def _cost_cell(costs, resource_id):
+    amount = costs.get(resource_id)
+    return "-" if amount is None else f"{amount:.2f}"
+
+
+def render_top_costs(console, costs, inventory, n, comp_name, include=None, view=None):
+    """비용 상위 n개 리소스 (수집한 인벤토리에 있으면 이름/종류로, 없으면 OCID 로 표시)"""
+    view = view or _DEFAULT_VIEW
+    console.print(f"\n[bold underline]Top {n} Resources by Cost[/bold underline]")
+    top = costs.top(n, include)
+    if not top:
+        console.print("(No Resource Cost Data)")
+        return
+    console.print(
+        f"[dim]{costs.line_items} usage line items, {len(costs.amounts)} resources, "
+        f"currency {costs.currency or '-'}[/dim]"
+    )
+
+    columns = [
+        ("#", {"justify": "right"}),
+        ("Compartment", {"style": "bold magenta"}),
+        ("Type", {}),
+        ("Name", {"style": "bold cyan"}),
+        ("Service", {}),
+        ("Cost($)", {"justify": "right"}),
+    ]
+
+    def rows():
+        for rank, (rid, amount) in enumerate(top, 1):
+            kind, rec = inventory.get(rid, (None, None))
+            if rec is not None:
+                comp, name = rec.compartment_name, rec.name
+            else:
+                comp, name = comp_name(costs.compartments.get(rid)), rid
+            yield None, (str(rank), comp, _text(kind), name, _text(costs.service(rid)), f"{amount:.2f}")
+
+    view.print_table(console, columns, rows())
+
+
+# -----------------------------------------------------------------------------
+# --filter 표현식 엔진
+# -----------------------------------------------------------------------------
+# 예) state=RUNNING and shape~E4 and compartment under prod
+#     (size>=1TB or tag.Env=prod) and not ad~AD-3
+#     ip in 10.0.0.0/16
+#
+# 비교식은 아직 모르는 필드가 있으면 None(미정)을 돌려주는 3값 논리로 평가한다.
+# 각 섹션은 컴파트먼트 → 목록 조회 → 상세 조회 순서로 아는 필드만 채워 평가하고,
+# False가 확정되는 즉시 이후의 상세 API 호출을 건너뛴다.
+# 최상위 AND 절의 '=' 비교는 목록 API 파라미터(lifecycle_state 등)로 내려보낸다.
+
+class FilterError(ValueError):
+    """--filter 표현식 파싱 오류"""
+
+
+_FILTER_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) | (?P<comma>,) |
+        (?P<op>>=|<=|!=|=|~|>|<) |
+        "(?P<dq>[^"]*)" | '(?P<sq>[^']*)' |
+        (?P<word>[^\s(),=!~<>"']+)
+    )""", re.X)
+
+_FILTER_FIELDS = ("name", "state", "shape", "ad", "compartment", "ip", "size", "vcpus", "memory")
+_FILTER_NUMERIC_FIELDS = ("size", "vcpus", "memory")
+_FILTER_SIZE_UNITS = {"MB": 1.0 / 1024, "GB": 1.0, "TB": 1024.0}
+
+# 섹션별 pushdown 가능한 필드 -> (목록 API 파라미터, 허용 값)
+_INSTANCE_PUSHDOWN = {
+    "name": ("display_name", None),
+    "ad": ("availability_domain", None),
+    "state": ("lifecycle_state", ("MOVING", "PROVISIONING", "RUNNING", "STARTING", "STOPPING",
+                                  "STOPPED", "CREATING_IMAGE", "TERMINATING", "TERMINATED")),
+}
+_LB_PUSHDOWN = {
+    "name": ("display_name", None),
+    "state": ("lifecycle_state", ("CREATING", "FAILED", "ACTIVE", "DELETING", "DELETED")),
+}
+_NSG_PUSHDOWN = {
+    "name": ("display_name", None),
+    "state": ("lifecycle_state", ("PROVISIONING", "AVAILABLE", "TERMINATING", "TERMINATED")),
+}
+_VOLUME_PUSHDOWN = {
+    "name": ("display_name", None),
+    "ad": ("availability_domain", None),
+    "state": ("lifecycle_state", ("PROVISIONING", "RESTORING", "AVAILABLE", "TERMINATING",
+                                  "TERMINATED", "FAULTY")),
+}
+
+
+def _as_network(value):
+    """IP/CIDR 문자열 -> ip_network (해석 불가 시 None)"""
+    try:
+        return ipaddress.ip_network(str(value), strict=False)
+    except ValueError:
+        return None
+
+
+class _FilterCmp:
+    __slots__ = ("field", "op", "value")
+
+    def __init__(self, field, op, value):
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def evaluate(self, fields, final, negate=False):
+        """negate: 바깥 not 을 비교식까지 내려 적용 (없는 필드는 not 아래에서도 매칭되지 않음)"""
+        if self.field.startswith("tag."):
+            key = "tags"
+        elif self.op == "under":
+            key = "compartment_path"
+        else:
+            key = self.field
+        if key not in fields:
+            return False if final else None
+        return self._evaluate(fields, key) != negate
+
+    def _evaluate(self, fields, key):
+        actual = fields[key]
+        if key == "tags":
+            actual = (actual or {}).get(self.field[4:])
+        if isinstance(actual, (list, tuple, set)):
+            values = [v for v in actual if v is not None]
+        else:
+            values = [] if actual is None else [actual]
+
+        if self.op == "!=":
+            return not any(self._equals(v) for v in values)
+        return any(self._match(v) for v in values)
+
+    def _equals(self, v):
+        if self.field == "ip":
+            return _as_network(v) == self.value
+        if self.field in _FILTER_NUMERIC_FIELDS:
+            return float(v) == self.value
+        if self.field == "state":
+            return str(v).upper() == self.value
+        return str(v) == self.value
+
+    def _match(self, v):
+        op = self.op
+        if op == "=":
+            return self._equals(v)
+        if op == "~":
+            return self.value in str(v).lower()
+        if op == "under":
+            return str(v).lower() == self.value
+        if op == "in":
+            if self.field == "ip":
+                net = _as_network(v)
+                return (net is not None and net.version == self.value.version
+                        and net.subnet_of(self.value))
+            return any(self._equals_value(v, item) for item in self.value)
+        num = float(v)
+        if op == ">":
+            return num > self.value
+        if op == ">=":
+            return num >= self.value
+        if op == "<":
+            return num < self.value
+        return num <= self.value
+
+    def _equals_value(self, v, item):
+        if self.field in _FILTER_NUMERIC_FIELDS:
+            return float(v) == item
+        if self.field == "state":
+            return str(v).upper() == item
+        return str(v) == item
+
+
+class _FilterBool:
+    __slots__ = ("op", "children")
+
+    def __init__(self, op, children):
+        self.op = op
+        self.children = children
+
+    def evaluate(self, fields, final, negate=False):
+        # not 은 드모르간으로 비교식까지 내려보냄: not (a and b) == (not a) or (not b)
+        if self.op == "not":
+            return self.children[0].evaluate(fields, final, not negate)
+
+        is_or = (self.op == "or") != negate
+        unknown = False
+        for child in self.children:
+            res = child.evaluate(fields, final, negate)
+            if res is None:
+                unknown = True
+            elif res == is_or:
+                # and: False 하나면 False / or: True 하나면 True
+                return res
+        return None if unknown else not is_or
+
+
+class ResourceFilter:
+    """컴파일된 --filter 표현식"""
+
+    def __init__(self, expr):
+        self.expr = expr
+        self._tokens = self._tokenize(expr)
+        self._pos = 0
+        self.root = self._parse_or()
+        if self._pos < len(self._tokens):
+            raise FilterError(f"예상치 못한 토큰: {self._tokens[self._pos][1]!r}")
+        del self._tokens
+
+    # ---- 평가 ---------------------------------------------------------------
+    def evaluate(self, fields, final=False):
+        """True/False, 또는 필드가 부족해 아직 판단할 수 없으면 None (final=True면 항상 bool)"""
+        return self.root.evaluate(fields, final)
+
+    def api_params(self, pushdown):
+        """최상위 AND 절의 '=' 비교 중 목록 API로 넘길 수 있는 것만 kwargs로 변환"""
+        params = {}
+        for node in self._conjuncts(self.root):
+            if not (isinstance(node, _FilterCmp) and node.op == "=" and node.field in pushdown):
+                continue
+            param, allowed = pushdown[node.field]
+            if allowed is None or node.value in allowed:
+                params[param] = node.value
+        return params
+
+    def references(self, field):
+        """표현식이 해당 필드를 참조하는지 여부 ('tag'는 모든 tag.* 필드)"""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, _FilterBool):
+                stack.extend(node.children)
+            elif node.field == field or (field == "tag" and node.field.startswith("tag.")):
+                return True
+        return False
+
+    def _conjuncts(self, node):
+        if isinstance(node, _FilterBool) and node.op == "and":
+            for child in node.children:
+                yield from self._conjuncts(child)
+        else:
+            yield node
+
+    # ---- 파싱 ---------------------------------------------------------------
+    @staticmethod
+    def _tokenize(expr):
+        tokens = []
+        pos = 0
+        expr = expr.rstrip()
+        while pos < len(expr):
+            m = _FILTER_TOKEN_RE.match(expr, pos)
+            if not m or m.end() == pos:
+                raise FilterError(f"해석할 수 없는 문자: {expr[pos:].strip()!r}")
+            pos = m.end()
+            kind = m.lastgroup
+            if kind in ("dq", "sq"):
+                tokens.append(("str", m.group(kind)))
+            elif kind == "word" and m.group(kind).lower() in ("and", "or", "not", "in", "under"):
+                tokens.append(("kw", m.group(kind).lower()))
+            else:
+                tokens.append((kind, m.group(kind)))
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def _next(self, what):
+        kind, text = self._peek()
+        if kind is None:
+            raise FilterError(f"{what}이(가) 필요합니다 (표현식이 끝남)")
+        self._pos += 1
+        return kind, text
+
+    def _parse_or(self):
+        children = [self._parse_and()]
+        while self._peek() == ("kw", "or"):
+            self._pos += 1
+            children.append(self._parse_and())
+        return children[0] if len(children) == 1 else _FilterBool("or", children)
+
+    def _parse_and(self):
+        children = [self._parse_unary()]
+        while self._peek() == ("kw", "and"):
+            self._pos += 1
+            children.append(self._parse_unary())
+        return children[0] if len(children) == 1 else _FilterBool("and", children)
+
+    def _parse_unary(self):
+        kind, text = self._peek()
+        if (kind, text) == ("kw", "not"):
+            self._pos += 1
+            return _FilterBool("not", [self._parse_unary()])
+        if kind == "lparen":
+            self._pos += 1
+            node = self._parse_or()
+            if self._next("')'")[0] != "rparen":
+                raise FilterError("')'이(가) 필요합니다")
+            return node
+        return self._parse_cmp()
+
+    def _parse_cmp(self):
+        kind, field = self._next("필드 이름")
+        if kind != "word":
+            raise FilterError(f"필드 이름이 필요합니다: {field!r}")
+        field = field.lower() if not field.lower().startswith("tag.") else "tag." + field[4:]
+        if field not in _FILTER_FIELDS and not (field.startswith("tag.") and len(field) > 4):
+            raise FilterError(f"알 수 없는 필드: {field!r} (사용 가능: {', '.join(_FILTER_FIELDS)}, tag.<key>)")
+
+        kind, op = self._next("연산자")
+        if kind not in ("op", "kw") or op in ("and", "or", "not"):
+            raise FilterError(f"'{field}' 뒤에 연산자가 필요합니다: {op!r}")
+
+        if op == "under":
+            if field != "compartment":
+                raise FilterError("'under'는 compartment 필드에만 사용할 수 있습니다")
+            return _FilterCmp(field, op, self._parse_value(field).lower())
+
+        if op == "in":
+            if field == "ip":
+                net = _as_network(self._parse_value(field))
+                if net is None:
+                    raise FilterError("'ip in' 뒤에는 CIDR이 필요합니다 (예: 10.0.0.0/16)")
+                return _FilterCmp(field, op, net)
+            if self._peek()[0] == "lparen":
+                self._pos += 1
+                items = [self._convert(field, self._parse_value(field))]
+                while self._peek()[0] == "comma":
+                    self._pos += 1
+                    items.append(self._convert(field, self._parse_value(field)))
+                if self._next("')'")[0] != "rparen":
+                    raise FilterError("값 목록은 ')'로 끝나야 합니다")
+                return _FilterCmp(field, op, tuple(items))
+            return _FilterCmp(field, op, (self._convert(field, self._parse_value(field)),))
+
+        if op in (">", ">=", "<", "<=") and field not in _FILTER_NUMERIC_FIELDS:
+            raise FilterError(f"'{op}'는 {', '.join(_FILTER_NUMERIC_FIELDS)} 필드에만 사용할 수 있습니다")
+        raw = self._parse_value(field)
+        if op == "~":
+            return _FilterCmp(field, op, raw.lower())
+        return _FilterCmp(field, op, self._convert(field, raw))
+
+    def _parse_value(self, field):
+        kind, text = self._next(f"'{field}'의 값")
+        if kind not in ("word", "str"):
+            raise FilterError(f"'{field}'의 값이 필요합니다: {text!r}")
+        return text
+
+    @staticmethod
+    def _convert(field, raw):
+        if field == "state":
+            return raw.upper()
+        if field == "ip":
+            net = _as_network(raw)
+            if net is None:
+                raise FilterError(f"IP/CIDR 형식이 아닙니다: {raw!r}")
+            return net
+        if field in _FILTER_NUMERIC_FIELDS:
+            m = re.fullmatch(r"([0-9]*\.?[0-9]+)\s*([KMGT]B)?", raw.upper())
+            if not m:
+                raise FilterError(f"숫자가 필요합니다: {raw!r}")
+            num = float(m.group(1))
+            if m.group(2):
+                if field == "vcpus" or m.group(2) not in _FILTER_SIZE_UNITS:
+                    raise FilterError(f"지원하지 않는 단위: {raw!r}")
+                num *= _FILTER_SIZE_UNITS[m.group(2)]
+            return num
+        return raw
+
+
+def _tag_fields(resource):
+    """freeform/defined 태그를 {'Key': v, 'Namespace.Key': v} 형태로 평탄화"""
+    tags = dict(getattr(resource, "freeform_tags", None) or {})
+    for ns, kv in (getattr(resource, "defined_tags", None) or {}).items():
+        for k, v in (kv or {}).items():
+            tags[f"{ns}.{k}"] = v
+    return tags
+
+
+def _compartment_fields(compartments):
+    """compartment id -> 필터 평가용 필드 (이름, 자신 포함 상위 컴파트먼트 이름 경로)"""
+    by_id = {c.id: c for c in compartments}
+    result = {}
+    for comp in compartments:
+        path = []
+        seen = set()
+        cur = comp
+        while cur is not None and cur.id not in seen:
+            seen.add(cur.id)
+            path.append(cur.name)
+            cur = by_id.get(cur.compartment_id)
+        result[comp.id] = {"compartment": comp.name, "compartment_path": tuple(path)}
+    return result
+
+
 
 if __name__ == "__main__":
-    main()
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        Console().print("\n[yellow]중단되었습니다. --journal 로 실행했다면 같은 옵션에 --resume 을 붙여 이어서 수집할 수 있습니다.[/yellow]")
+        sys.exit(130)
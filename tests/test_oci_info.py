@@ -0,0 +1,300 @@
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace as NS
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import oci
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import oci_info  # noqa: E402
+
+
+TENANCY = "ocid1.tenancy.oc1..test"
+
+
+def _config():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                            serialization.NoEncryption()).decode()
+    return {
+        "tenancy": TENANCY,
+        "user": "ocid1.user.oc1..test",
+        "fingerprint": ":".join(["aa"] * 16),
+        "key_content": pem,
+        "region": "ap-seoul-1",
+    }
+
+
+@pytest.fixture(scope="module")
+def config():
+    return _config()
+
+
+class _Server:
+    """HTTPAdapter.send 를 대신해 (status, body) 응답을 차례로 돌려주는 가짜 서버"""
+
+    def __init__(self, monkeypatch, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        monkeypatch.setattr(oci._vendor.requests.adapters.HTTPAdapter, "send",
+                            lambda adapter, request, **kwargs: self.send(request))
+
+    def send(self, request):
+        self.requests.append(request)
+        status, body = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        response = oci._vendor.requests.Response()
+        response.status_code = status
+        response.headers["content-type"] = "application/json"
+        response.headers["opc-request-id"] = "test"
+        if isinstance(body, tuple):
+            body, next_page = body
+            response.headers["opc-next-page"] = next_page
+        response._content = json.dumps(body).encode()
+        response.request = request
+        response.url = request.url
+        return response
+
+
+INSTANCE = {"id": "ocid1.instance.oc1..a", "displayName": "web-1", "lifecycleState": "RUNNING",
+            "compartmentId": TENANCY, "availabilityDomain": "AD-1", "shape": "VM.Standard.E4.Flex",
+            "region": "ap-seoul-1", "timeCreated": "2024-01-01T00:00:00.000Z"}
+THROTTLED = (429, {"code": "TooManyRequests", "message": "throttled"})
+
+
+def test_deadline_retry_strategy_with_sdk_client(config, monkeypatch):
+    server = _Server(monkeypatch, (200, INSTANCE))
+    factory = oci_info.ClientFactory(config, deadline=oci_info.Deadline(60))
+    compute = factory.get(oci.core.ComputeClient)
+
+    assert isinstance(compute.retry_strategy, oci_info._DeadlineRetryStrategy)
+    assert compute.get_instance(INSTANCE["id"]).data.display_name == "web-1"
+    assert len(server.requests) == 1
+
+
+def test_deadline_retry_strategy_gives_up_before_deadline(config, monkeypatch):
+    server = _Server(monkeypatch, THROTTLED)
+    factory = oci_info.ClientFactory(config, deadline=oci_info.Deadline(0.5))
+    compute = factory.get(oci.core.ComputeClient)
+
+    started = time.monotonic()
+    with pytest.raises(oci.exceptions.ServiceError) as err:
+        compute.get_instance(INSTANCE["id"])
+    assert err.value.status == 429
+    assert time.monotonic() - started < 0.5
+    assert len(server.requests) == 1
+
+
+def test_throttled_page_gives_up_before_deadline(config, monkeypatch):
+    server = _Server(monkeypatch, (200, ([INSTANCE], "page-2")), THROTTLED)
+    deadline = oci_info.Deadline(1)
+    compute = oci_info.ClientFactory(config, deadline=deadline).get(oci.core.ComputeClient)
+
+    started = time.monotonic()
+    with pytest.raises(oci.exceptions.ServiceError) as err:
+        oci_info._list_pages(compute.list_instances, deadline, compartment_id=TENANCY)
+    assert err.value.status == 429
+    assert time.monotonic() - started < 1
+    assert len(server.requests) == 2
+    assert "page=page-2" in server.requests[1].url
+
+
+def test_deadline_between_pages_keeps_partial_items(config, monkeypatch):
+    deadline = oci_info.Deadline(0.2)
+    server = _Server(monkeypatch, (200, ([INSTANCE], "page-2")), (200, [INSTANCE]))
+    send = server.send
+
+    def slow_send(request):
+        time.sleep(0.3)
+        return send(request)
+    server.send = slow_send
+    compute = oci_info.ClientFactory(config, deadline=deadline).get(oci.core.ComputeClient)
+
+    with pytest.raises(oci_info.DeadlineExceeded) as err:
+        oci_info._list_pages(compute.list_instances, deadline, compartment_id=TENANCY)
+    assert [inst.id for inst in err.value.partial] == [INSTANCE["id"]]
+    assert len(server.requests) == 1
+
+
+def _page(data):
+    return NS(data=data, next_page=None, headers={})
+
+
+class _FakeClient:
+    """list_* 는 빈 목록, 생성 시 넘긴 함수 외의 다른 메서드는 호출하면 실패"""
+
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+    def __getattr__(self, name):
+        if name.startswith("list_"):
+            return lambda *args, **kwargs: _page([])
+
+        def missing(*args, **kwargs):
+            raise RuntimeError(f"unexpected call: {name}")
+        return missing
+
+
+class _FakeClients:
+    def __init__(self, clients):
+        self.clients = clients
+
+    def get(self, client_class, **kwargs):
+        return self.clients.setdefault(client_class, _FakeClient())
+
+
+def _resource(ocid, name, comp_id, **fields):
+    return NS(id=ocid, display_name=name, compartment_id=comp_id, lifecycle_state="AVAILABLE",
+              freeform_tags={}, defined_tags={}, **fields)
+
+
+def _compartment(ocid, name, parent_id):
+    return NS(id=ocid, name=name, compartment_id=parent_id, lifecycle_state="ACTIVE",
+              freeform_tags={}, defined_tags={})
+
+
+def test_instance_volumes_in_other_compartment(config):
+    comps = [_compartment("ocid1.compartment.oc1..app", "app", TENANCY),
+             _compartment("ocid1.compartment.oc1..data", "data", TENANCY)]
+    inst = _resource("ocid1.instance.oc1..a", "web-1", comps[0].id, availability_domain="AD-1",
+                     shape="VM.Standard.E4.Flex", shape_config=None)
+    inst.lifecycle_state = "RUNNING"
+
+    def attached(**fields):
+        return NS(instance_id=inst.id, lifecycle_state="ATTACHED", **fields)
+
+    volumes = {
+        "ocid1.bootvolume.oc1..b": _resource("ocid1.bootvolume.oc1..b", "boot", comps[1].id, size_in_gbs=50,
+                                             availability_domain="AD-1"),
+        "ocid1.volume.oc1..v": _resource("ocid1.volume.oc1..v", "data", comps[1].id, size_in_gbs=200,
+                                         availability_domain="AD-1"),
+    }
+    clients = _FakeClients({
+        oci.identity.IdentityClient: _FakeClient(
+            list_compartments=lambda *args, **kwargs: _page(comps),
+            get_compartment=lambda comp_id: _page(_compartment(TENANCY, "root", None)),
+            list_availability_domains=lambda comp_id: _page([NS(name="AD-1")]),
+        ),
+        oci.core.ComputeClient: _FakeClient(
+            list_instances=lambda compartment_id, **kwargs: _page([inst] if compartment_id == inst.compartment_id else []),
+            list_volume_attachments=lambda compartment_id, **kwargs: _page(
+                [attached(volume_id="ocid1.volume.oc1..v")] if compartment_id == inst.compartment_id else []),
+            list_boot_volume_attachments=lambda compartment_id, **kwargs: _page(
+                [attached(boot_volume_id="ocid1.bootvolume.oc1..b")] if compartment_id == inst.compartment_id else []),
+        ),
+        oci.core.BlockstorageClient: _FakeClient(
+            get_volume=lambda ocid: _page(volumes[ocid]),
+            get_boot_volume=lambda ocid: _page(volumes[ocid]),
+        ),
+    })
+    ctx = oci_info.InventoryContext(config, clients=clients)
+    ctx.load_compartments("app")
+
+    records = list(oci_info.collect_instances(ctx))
+    assert [(r.name, r.boot_volume_gb, r.block_volume_gb) for r in records] == [("web-1", 50, (200,))]
+
+
+@pytest.mark.parametrize("vnic_ips", [False, True])
+def test_lb_backend_resolved_in_lb_vcn_only(vnic_ips):
+    comp = _compartment("ocid1.compartment.oc1..app", "app", TENANCY)
+    subnets = {
+        f"ocid1.subnet.oc1..{name}": _resource(f"ocid1.subnet.oc1..{name}", name, comp.id, vcn_id=f"ocid1.vcn.oc1..{name}",
+                                              cidr_block="10.0.0.0/24", security_list_ids=[])
+        for name in ("a", "b")
+    }
+    instances = [_resource(f"ocid1.instance.oc1..{name}", f"web-{name}", comp.id, availability_domain="AD-1",
+                           shape="VM.Standard.E4.Flex", shape_config=None) for name in ("a", "b")]
+    vnic_attachments = [
+        NS(vnic_id=f"ocid1.vnic.oc1..{name}", instance_id=f"ocid1.instance.oc1..{name}", lifecycle_state="ATTACHED",
+           subnet_id=f"ocid1.subnet.oc1..{name}", display_name=None, compartment_id=comp.id, nic_index=0)
+        for name in ("a", "b")
+    ]
+    backend = NS(name="10.0.0.5:80", ip_address="10.0.0.5")
+    lbs = [
+        _resource(f"ocid1.loadbalancer.oc1..{name}", f"lb-{name}", comp.id, shape_name="flexible", ip_addresses=[],
+                  subnet_ids=subnet_ids, network_security_group_ids=[], backend_sets={"bs": NS(backends=[backend])})
+        for name, subnet_ids in (("b", ["ocid1.subnet.oc1..b"]), ("unknown", ["ocid1.subnet.oc1..gone"]))
+    ]
+
+    def get_subnet(subnet_id):
+        if subnet_id not in subnets:
+            raise RuntimeError(subnet_id)
+        return _page(subnets[subnet_id])
+
+    def list_private_ips(subnet_id, **kwargs):
+        name = subnet_id.rsplit(".", 1)[1]
+        return _page([NS(id=f"pip-{name}", ip_address="10.0.0.5", vnic_id=f"ocid1.vnic.oc1..{name}",
+                         subnet_id=subnet_id, is_primary=True)])
+
+    compute = _FakeClient(list_instances=lambda **kwargs: _page(instances),
+                          list_vnic_attachments=lambda **kwargs: _page(vnic_attachments))
+    network = _FakeClient(get_subnet=get_subnet, list_private_ips=list_private_ips,
+                          list_subnets=lambda **kwargs: _page(list(subnets.values())))
+    lb_client = _FakeClient(list_load_balancers=lambda **kwargs: _page(lbs))
+    scopes = {"compute": [comp], "lb": [comp]}
+    if not vnic_ips:
+        scopes["network"] = [comp]
+
+    graph = oci_info.build_resource_graph(compute, network, _FakeClient(), lb_client, scopes, [], 2, vnic_ips=vnic_ips)
+    assert graph.out("ocid1.loadbalancer.oc1..b", oci_info.EDGE_BACKEND) == ["ocid1.instance.oc1..b"]
+    assert graph.resolve_target("10.0.0.5", graph.vcns_of("ocid1.loadbalancer.oc1..b")) == "web-b (10.0.0.5)"
+    # LB 서브넷의 VCN 을 모르면 추측하지 않음
+    assert graph.out("ocid1.loadbalancer.oc1..unknown", oci_info.EDGE_BACKEND) == []
+
+
+def test_clients_share_pool_but_not_session(config, monkeypatch):
+    server = _Server(monkeypatch, (200, INSTANCE))
+    factory = oci_info.ClientFactory(config)
+    compute = factory.get(oci.core.ComputeClient)
+    network = factory.get(oci.core.VirtualNetworkClient)
+    assert compute.base_client.session is not network.base_client.session
+    assert compute.base_client.session.get_adapter("https://x") is network.base_client.session.get_adapter("https://x")
+
+    # SDK 의 세션 재설정(복사 후 닫기)이 공유 풀을 닫지 않아야 함
+    pool = factory.adapter.poolmanager.connection_from_url("https://iaas.ap-seoul-1.oraclecloud.com")
+    compute.base_client._reset_session(reason="test")
+    assert factory.adapter.poolmanager.connection_from_url("https://iaas.ap-seoul-1.oraclecloud.com") is pool
+    assert compute.get_instance(INSTANCE["id"]).data.display_name == "web-1"
+    assert len(server.requests) == 1
+
+
+def test_records_are_hashable():
+    a = oci_info.VolumeRecord(id="ocid1.volume.oc1..a", name="data", size_gb=100)
+    b = oci_info.VolumeRecord(id="ocid1.volume.oc1..a", name="data", size_gb=100)
+    assert a == b and len({a, b}) == 1
+    assert len({a, oci_info.VolumeRecord(id="ocid1.volume.oc1..a", name="data", size_gb=200)}) == 2
+    assert {oci_info.BackendRecord(name="10.0.0.5:80"): 1}[oci_info.BackendRecord(name="10.0.0.5:80")] == 1
+
+
+def test_journal_units_keyed_by_pushed_down_filter(tmp_path):
+    comp = _compartment("ocid1.compartment.oc1..app", "app", TENANCY)
+    calls = []
+
+    def list_instances(compartment_id, **kwargs):
+        calls.append(kwargs)
+        return _page([])
+
+    compute = _FakeClient(list_instances=list_instances)
+    running = {oci_info.KIND_INSTANCE: {"lifecycle_state": "RUNNING"}}
+    # 같은 --filter 라도 함께 보는 섹션에 따라 목록 API 로 내려보내는 조건이 다름
+    for resume, list_kwargs in ((False, running), (True, {}), (True, running), (True, {})):
+        journal = oci_info.CollectionJournal(str(tmp_path / "journal.jsonl"), {"filter": "state=RUNNING"}, resume)
+        try:
+            oci_info.build_resource_graph(compute, _FakeClient(), _FakeClient(), _FakeClient(), {"compute": [comp]},
+                                          [], 1, list_kwargs=list_kwargs, journal=journal)
+        finally:
+            journal.close()
+    # 조건을 걸어 읽은 목록을 조건 없는 목록으로 복원하지 않고, 같은 조건이면 복원
+    assert calls == [{"lifecycle_state": "RUNNING"}, {}]
+
+
+def test_sort_applies_only_to_tables_with_the_field():
+    view = oci_info.TableView(page_size=10, sort="-size", limit=5)
+    assert view.for_type(oci_info.VolumeRecord) is view
+    instances = view.for_type(oci_info.InstanceRecord)
+    assert (instances.sort_field, instances.page_size, instances.limit) == (None, 10, 5)
+    assert instances.grouped and not view.grouped